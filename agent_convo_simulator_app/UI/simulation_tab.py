@@ -17,14 +17,6 @@ class SimulationTab(ttk.Frame):
         self.create_widgets()
         self.blinking_messages = {}
         self.conversation_paused = False  # Track paused state
-    def __init__(self, parent, app, data_manager):
-        super().__init__(parent)
-        self.app = app
-        self.data_manager = data_manager
-        # Use new ConversationEngine
-        self.app.conversation_engine = ConversationEngine()
-        self.create_widgets()
-        self.blinking_messages = {}
 
     def create_widgets(self):
         """Create the conversation simulation tab."""
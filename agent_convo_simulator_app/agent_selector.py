@@ -8,11 +8,11 @@ import re
 import json
 from typing import List, Dict, Optional, Any
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import HumanMessage
 from datetime import datetime
 
 from .config import MODEL_SETTINGS, AGENT_SETTINGS
+from .backend_utils import get_chat_model
 
 
 class AgentSelector:
@@ -28,11 +28,11 @@ class AgentSelector:
             raise ValueError("Google API key is required. Set GOOGLE_API_KEY environment variable or pass it directly.")
         
         # Initialize LLM for agent selection
-        self.model = ChatGoogleGenerativeAI(
-            model=MODEL_SETTINGS["agent_model"],
-            temperature=AGENT_SETTINGS["response_temperature"],
-            max_retries=AGENT_SETTINGS["max_retries"],
-            google_api_key=self.google_api_key
+        self.model = get_chat_model(
+            MODEL_SETTINGS["agent_model"],
+            AGENT_SETTINGS["response_temperature"],
+            AGENT_SETTINGS["max_retries"],
+            self.google_api_key
         )
     
     def select_next_agent(
@@ -10,9 +10,8 @@ from langchain_core.messages import HumanMessage
 from langgraph.prebuilt import create_react_agent
 from .config import CONVERSATION_TIMING, AGENT_SETTINGS, MODEL_SETTINGS
 from .audio_manager import AudioManager
-from .data_manager import DataManager
-from .backend_utils import _load_agent_tools, create_agent_base_prompt, create_agent_prompt, message_list_summarization
-from langgraph.checkpoint.memory import InMemorySaver
+from .data_manager import DataManager, SaveFlusher
+from .backend_utils import _load_agent_tools, get_chat_model, create_agent_base_prompt, create_agent_prompt, PromptSegmentCache, message_list_summarization
 import os
 from .agent_selector import AgentSelector
 
@@ -31,6 +30,8 @@ class AgentSelectorEngine:
         self.audio_manager = AudioManager()
         self.lock = threading.Lock()
         self.data_manager = DataManager()
+        # Set while paused; backs the `paused` property so waits between turns end as soon as it is paused
+        self._pause_event = threading.Event()
         self.active = True
         self.paused = False
         self.convo_id = None
@@ -50,6 +51,25 @@ class AgentSelectorEngine:
         self.last_message = None
         self.ui_callback = None
         self.selector = None
+        # Bumped by start/resume/pause; a driver thread whose run id is stale stops at its next check
+        self._run_id = 0
+        self._selector_agents = []  # name/role pairs sent to the selector, built once per cycle
+        # Rendered head and tail of each agent's prompt, re-rendered when the scene changes
+        self._prompt_segments = PromptSegmentCache()
+        # Conversation saves are written by a background flusher instead of on every message
+        self._flusher = SaveFlusher(self.parent_engine._save_conversation_state,
+                                    CONVERSATION_TIMING["save_debounce_delay"], name="agent_selector_flusher")
+
+    @property
+    def paused(self):
+        return self._pause_event.is_set()
+
+    @paused.setter
+    def paused(self, value):
+        if value:
+            self._pause_event.set()
+        else:
+            self._pause_event.clear()
 
     def start_cycle(self, conversation_id, agents, voices_enabled, termination_condition, agent_selector_api_key):
         print(f"🚦 [AgentSelectorEngine] Agent selector engine STARTED for conversation: {conversation_id}")
@@ -81,7 +101,9 @@ class AgentSelectorEngine:
         if "LLM_sending_messages" not in self.convo or not isinstance(self.convo["LLM_sending_messages"], list):
             self.convo["LLM_sending_messages"] = []
         self.selector = AgentSelector(google_api_key=agent_selector_api_key)
+        self._selector_agents = [{"name": a["name"], "role": a["role"]} for a in self.agents]
         self.agent_instances = []
+        self._prompt_segments.clear()
         for agent_id in self.agent_order:
             agent_config = next(a for a in self.agents if a["id"] == agent_id)
             agent_name = agent_config["name"]
@@ -89,18 +111,16 @@ class AgentSelectorEngine:
             agent_tools = _load_agent_tools(agent_name)
             base_prompt = create_agent_base_prompt(agent_config)
             agent_api_key = agent_config.get("api_key") or getattr(self.parent_engine, "default_api_key", None)
-            from langchain_google_genai import ChatGoogleGenerativeAI
-            agent_model = ChatGoogleGenerativeAI(
-                model=MODEL_SETTINGS["agent_model"],
-                temperature=AGENT_SETTINGS["response_temperature"],
-                max_retries=AGENT_SETTINGS["max_retries"],
-                google_api_key=agent_api_key
+            agent_model = get_chat_model(
+                MODEL_SETTINGS["agent_model"],
+                AGENT_SETTINGS["response_temperature"],
+                AGENT_SETTINGS["max_retries"],
+                agent_api_key
             )
             agent_variable = create_react_agent(
                 model=agent_model,
                 tools=agent_tools,
-                prompt=base_prompt,
-                checkpointer=InMemorySaver()
+                prompt=base_prompt
             )
             self.agent_instances.append({
                 "agent_name": agent_name,
@@ -109,31 +129,36 @@ class AgentSelectorEngine:
                 "config": agent_config
             })
         print(f"✅ [AgentSelectorEngine] All agents initialized. Starting agent selector thread.")
-        self._thread = threading.Thread(target=self._run_agent_selector, daemon=True)
+        self._run_id += 1
+        self._thread = threading.Thread(target=self._run_agent_selector, args=(self._run_id,), daemon=True)
         self._thread.start()
 
-    def _run_agent_selector(self):
+    def _stale(self, run_id):
+        """True once the driver started with run_id has been paused or superseded."""
+        return run_id != self._run_id or not self.active or self.paused
+
+    def _run_agent_selector(self, run_id):
         print(f"[AgentSelectorEngine] Agent selector main loop started.")
-        while self.active:
-            if self.paused:
-                print("⏸️ [AgentSelectorEngine] Paused. Waiting...")
-                time.sleep(0.2)
+        while True:
+            if self._stale(run_id):
+                print("⏸️ [AgentSelectorEngine] Paused. Stopping agent selector thread.")
                 return
             print(f"[AgentSelectorEngine] Selecting next agent using LLM...")
             llm_messages = self.convo.get("LLM_sending_messages", [])
             environment = self.convo.get("environment", "")
             scene = self.convo.get("scene_description", "")
-            agents_for_selector = [{"name": a["name"], "role": a["role"]} for a in self.agents]
             termination_condition = self.termination_condition
             agent_invocation_counts = None  # Optional: can be tracked if needed
             selector_response = self.selector.select_next_agent(
                 llm_messages,
                 environment,
                 scene,
-                agents_for_selector,
+                self._selector_agents,
                 termination_condition,
                 agent_invocation_counts
             )
+            if self._stale(run_id):
+                return
             next_agent_name = selector_response.get("next_response")
             print(f"[AgentSelectorEngine] LLM selected next agent: {next_agent_name}")
             if next_agent_name == "terminate":
@@ -145,14 +170,17 @@ class AgentSelectorEngine:
             agent_instance = next((a for a in self.agent_instances if a["agent_name"] == next_agent_name), None)
             if not agent_config or not agent_instance:
                 print(f"❌ [AgentSelectorEngine] Agent '{next_agent_name}' not found. Skipping.")
-                time.sleep(1)
+                self._pause_event.wait(1)
                 continue
             print(f"[AgentSelectorEngine] Invoking agent: {next_agent_name}")
             should_remind = self._should_remind_termination()
-            message = self._invoke_agent(agent_config, agent_instance, should_remind)
+            message = self._invoke_agent(agent_config, agent_instance, should_remind, run_id)
+            # A newer driver may own the conversation by the time the agent answers
+            if self._stale(run_id):
+                return
             if not message:
                 print(f"⚠️ [AgentSelectorEngine] No message from agent: {next_agent_name}. Skipping.")
-                time.sleep(1)
+                self._pause_event.wait(1)
                 continue
             print(f"[AgentSelectorEngine] Message received from {next_agent_name}: {message['message'][:60]}...")
             if self.voices_enabled and agent_config.get("voice"):
@@ -172,11 +200,10 @@ class AgentSelectorEngine:
                 }
                 self._display_message(agent_config, loading_message)
                 audio_data = self.audio_manager._generate_audio_sync(message["message"], agent_config["voice"])
-                if self.paused:
+                if self._stale(run_id):
                     loading_message["loading"] = False
                     self._display_message(agent_config, loading_message)
-                    time.sleep(0.2)
-                    continue
+                    return
                 print(f"[AgentSelectorEngine] Audio received for agent: {next_agent_name}")
                 actual_message = {
                     "agent_no": agent_config.get('agent_no'),
@@ -199,28 +226,40 @@ class AgentSelectorEngine:
                         'voice': agent_config["voice"]
                     })
                 print(f"[AgentSelectorEngine] Audio finished for {next_agent_name}.")
+                if self._stale(run_id):
+                    return
             else:
                 self._add_message_to_conversation(message)
                 self._display_message(agent_config, message)
                 delay = self._get_turn_delay()
                 print(f"[AgentSelectorEngine] Waiting {delay:.2f} seconds before next agent.")
-                time.sleep(delay)
+                # Returns early if the conversation is paused during the delay
+                self._pause_event.wait(delay)
+                if self._stale(run_id):
+                    return
             self.round_count += 1
             self._maybe_remind_termination()
 
-    def _invoke_agent(self, agent_config, agent_instance, should_remind=None):
+    def _invoke_agent(self, agent_config, agent_instance, should_remind=None, run_id=None):
         try:
             agent_name = agent_config["name"]
             print(f"🧠 [AgentSelector] Preparing to invoke agent: {agent_name}")
             agent_variable = agent_instance["agent_variable"]
             llm_messages = self.convo.get("LLM_sending_messages", [])
-            self.convo["LLM_sending_messages"] = message_list_summarization(llm_messages)
+            summarized = message_list_summarization(llm_messages)
+            if run_id is not None and self._stale(run_id):
+                return None
+            self.convo["LLM_sending_messages"] = summarized
             tool_names = agent_config["tools"]
-            thread_id = self.convo.get("thread_id")
-            if not thread_id:
-                import uuid
-                thread_id = f"thread_{uuid.uuid4().hex[:8]}"
-                self.convo["thread_id"] = thread_id
+            prompt_segments = self._prompt_segments.segments_for(
+                agent_config,
+                self.convo["environment"],
+                self.convo["scene_description"],
+                self.agent_order,
+                agent_name=agent_name,
+                available_tools=tool_names,
+                agent_obj=agent_config
+            )
             prompt = create_agent_prompt(
                 agent_config,
                 self.convo["environment"],
@@ -232,12 +271,13 @@ class AgentSelectorEngine:
                 conversation_id=self.convo_id,
                 agent_name=agent_name,
                 available_tools=tool_names,
-                agent_obj=agent_config            )
+                agent_obj=agent_config,
+                prompt_segments=prompt_segments
+            )
 
 
             print(f"📝 [AgentSelector] Sending prompt to {agent_name} (length: {len(prompt)} chars)")
-            config = {"configurable": {"thread_id": f"{thread_id}_{agent_name}"}}
-            response = agent_variable.invoke({"messages": [HumanMessage(content=prompt)]}, config)
+            response = agent_variable.invoke({"messages": [HumanMessage(content=prompt)]})
             if response and "messages" in response and response["messages"]:
                 agent_response = response["messages"][-1].content
             else:
@@ -261,7 +301,7 @@ class AgentSelectorEngine:
                 self.convo["messages"].append(msg_to_store)
             if msg_to_store not in self.convo["LLM_sending_messages"]:
                 self.convo["LLM_sending_messages"].append(msg_to_store)
-        self.parent_engine._save_conversation_state(self.convo_id)
+        self._flusher.mark_dirty(self.convo_id)
 
     def _display_message(self, agent_config, message, blinking=False):
         ui_callback = self.ui_callback
@@ -306,6 +346,9 @@ class AgentSelectorEngine:
         print(f"[AgentSelectorEngine] pause_cycle called for conversation_id={conversation_id}")
         self.active = False
         self.paused = True
+        self._run_id += 1
+        self._flusher.discard(conversation_id)
+        self._flusher.stop()
         if self.convo and "messages" in self.convo:
             print(f"[AgentSelectorEngine] Saving displayed messages to conversations.json")
             self.parent_engine._save_conversation_state(conversation_id)
@@ -318,17 +361,18 @@ class AgentSelectorEngine:
         print(f"[AgentSelectorEngine] pause_cycle complete")
 
     def resume_cycle(self, conversation_id):
-        import time as _time
         import threading as _threading
         self.ui_callback = self.parent_engine.message_callbacks.get(conversation_id)
         print(f"[AgentSelectorEngine] resume_cycle called for conversation_id={conversation_id} (thread: {_threading.current_thread().ident})")
         self.active = False
         self.paused = True
+        self._run_id += 1
         if hasattr(self, '_thread') and self._thread is not None:
             if self._thread.is_alive():
                 print("[AgentSelectorEngine] Waiting for previous agent selector thread to finish...")
                 self._thread.join(timeout=5)
                 if self._thread.is_alive():
+                    # Its run id is stale, so it exits at its next check without touching the conversation
                     print("[AgentSelectorEngine] Warning: Previous thread did not finish in time.")
         self.convo_id = conversation_id
         print(f"[AgentSelectorEngine] _run_agent_selector started (thread: {_threading.current_thread().ident})")
@@ -353,7 +397,9 @@ class AgentSelectorEngine:
         if missing_agents:
             print(f"❌ [AgentSelectorEngine] Missing agent(s) in DataManager: {missing_agents}")
         self.selector = AgentSelector(google_api_key=self.agent_selector_api_key)
+        self._selector_agents = [{"name": a["name"], "role": a["role"]} for a in self.agents]
         self.agent_instances = []
+        self._prompt_segments.clear()
         for agent_id in self.agent_order:
             agent_config = next(a for a in self.agents if a["id"] == agent_id)
             agent_name = agent_config["name"]
@@ -361,18 +407,16 @@ class AgentSelectorEngine:
             agent_tools = _load_agent_tools(agent_name)
             base_prompt = create_agent_base_prompt(agent_config)
             agent_api_key = agent_config.get("api_key") or getattr(self.parent_engine, "default_api_key", None)
-            from langchain_google_genai import ChatGoogleGenerativeAI
-            agent_model = ChatGoogleGenerativeAI(
-                model=MODEL_SETTINGS["agent_model"],
-                temperature=AGENT_SETTINGS["response_temperature"],
-                max_retries=AGENT_SETTINGS["max_retries"],
-                google_api_key=agent_api_key
+            agent_model = get_chat_model(
+                MODEL_SETTINGS["agent_model"],
+                AGENT_SETTINGS["response_temperature"],
+                AGENT_SETTINGS["max_retries"],
+                agent_api_key
             )
             agent_variable = create_react_agent(
                 model=agent_model,
                 tools=agent_tools,
-                prompt=base_prompt,
-                checkpointer=InMemorySaver()
+                prompt=base_prompt
             )
             self.agent_instances.append({
                 "agent_name": agent_name,
@@ -386,12 +430,12 @@ class AgentSelectorEngine:
                 "agent_variable": agent_variable,
                 "config": agent_config
             })
-        _time.sleep(20)
         self.active = True
         self.paused = False
         self.voices_enabled = self.convo.get("voices_enabled", False)
         print(f"✅ [AgentSelector] Resuming convo: All agents initialized. Starting agent selector thread.")
-        self._thread = threading.Thread(target=self._run_agent_selector, daemon=True)
+        self._run_id += 1
+        self._thread = threading.Thread(target=self._run_agent_selector, args=(self._run_id,), daemon=True)
         self._thread.start()
 
     def update_scene_environment(self, conversation_id, environment=None, scene_description=None):
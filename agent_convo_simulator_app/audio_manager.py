@@ -9,7 +9,7 @@ import io
 import threading
 import queue
 import time
-from typing import Dict, Callable, Optional
+from typing import AsyncIterator, Dict, Callable, Iterable, Optional
 import pygame
 
 
@@ -92,6 +92,35 @@ class AudioManager:
             print(f"Error generating audio: {e}")
             return None
     
+    async def generate_audio_stream(self, text: str, voice: str) -> AsyncIterator[bytes]:
+        """Yield WAV clips from the Kokoro streaming endpoint as each one is synthesized."""
+        try:
+            async with aiohttp.ClientSession() as session:
+                payload = {
+                    "text": text,
+                    "voice": voice
+                }
+
+                async with session.post(
+                    f"{self.kokoro_api_url}/synthesize_streaming",
+                    json=payload,
+                    timeout=aiohttp.ClientTimeout(total=None, sock_read=30)
+                ) as response:
+                    if response.status != 200:
+                        print(f"Kokoro API error: {response.status}")
+                        return
+                    # Events are "data: <base64 WAV>" separated by blank lines; a clip can
+                    # exceed aiohttp's line limit, so split the raw stream ourselves.
+                    buffer = b""
+                    async for data in response.content.iter_any():
+                        buffer += data
+                        while b"\n\n" in buffer:
+                            event, buffer = buffer.split(b"\n\n", 1)
+                            if event.startswith(b"data: "):
+                                yield base64.b64decode(event[6:])
+        except Exception as e:
+            print(f"Error streaming audio: {e}")
+
     def _generate_audio_sync(self, text: str, voice: str) -> Optional[bytes]:
         """Generate audio synchronously (wrapper around async method)."""
         try:
@@ -112,6 +141,7 @@ class AudioManager:
         request = {
             'conversation_id': conversation_id,
             'agent_id': agent_id,
+            'message_id': message_id,
             'text': text,
             'voice': voice
         }
@@ -135,7 +165,7 @@ class AudioManager:
                         self.audio_ready_callback(
                             request['conversation_id'],
                             request['agent_id'],
-                            None
+                            request.get('message_id')
                         )
                     
                     # Play audio if pygame is available
@@ -147,7 +177,7 @@ class AudioManager:
                             self.audio_finished_callback(
                                 request['conversation_id'],
                                 request['agent_id'],
-                                None
+                                request.get('message_id')
                             )
                 else:
                     print(f"Failed to generate audio for agent {request['agent_id']}")
@@ -161,26 +191,31 @@ class AudioManager:
     
     def _play_audio(self, audio_data: bytes, request: Dict):
         """Play audio data using pygame."""
+        self.play_chunks((audio_data,), request)
+
+    def play_chunks(self, chunks: Iterable[bytes], request: Dict):
+        """Play WAV clips back to back, firing the finished callback once at the end.
+
+        chunks may be a generator that is still receiving clips from the TTS service.
+        """
         try:
             self.current_audio_info = request
             
-            # Load audio from bytes
-            audio_file = io.BytesIO(audio_data)
-            sound = pygame.mixer.Sound(audio_file)
-            
-            # Play the sound
-            channel = sound.play()
-            
-            # Wait for playback to finish
-            while channel.get_busy():
-                time.sleep(0.1)
+            for audio_data in chunks:
+                # Load audio from bytes
+                sound = pygame.mixer.Sound(io.BytesIO(audio_data))
+                
+                # Play the clip and wait for it to finish
+                channel = sound.play()
+                while channel.get_busy():
+                    time.sleep(0.1)
             
             # Notify that audio finished playing
             if self.audio_finished_callback:
                 self.audio_finished_callback(
                     request['conversation_id'],
                     request['agent_id'],
-                    None
+                    request.get('message_id')
                 )
             
             self.current_audio_info = None
@@ -1,4 +1,7 @@
 
+import functools
+import importlib
+import json
 import os
 from typing import Dict, List
 from langchain_core.messages import HumanMessage
@@ -102,19 +105,71 @@ def create_agent_base_prompt(agent_config):
     return prompt
 
 
-def create_agent_prompt(agent_config, environment, scene_description, messages, all_agents, termination_condition=None, should_remind_termination=False, conversation_id=None, agent_name=None, available_tools=None, agent_obj=None):
+def create_agent_prompt_segments(agent_config, environment, scene_description, all_agents, agent_name=None, available_tools=None, agent_obj=None):
     """
-    Create the prompt for an agent including scene, participants, and conversation history.
+    Build the static parts of an agent prompt: the scene header and the closing instructions.
+    These only change when the scene or the agent changes, so engines can cache them per agent.
     """
     if not agent_name:
         agent_name = agent_config["name"]
 
-    prompt = f"""
+    head = f"""
             Always answer based on the given characteristics. Stay in character always.
             INITIAL SCENE: {environment}
             SCENE DESCRIPTION: {scene_description}
             \nPARTICIPANTS: {', '.join(all_agents)}\n\nTool Usage: Use your tools freely in the first instance you feel,  just like a noraml person using their mobile phone as a tool. No need to get permsission from other agents. But when it's necessary discuss with other agents how the tools should be used.\n\n"""
-    
+
+    tail = ""
+    if available_tools:
+        tail += f"""AVAILABLE TOOLS: You have access to the following tools: {', '.join(available_tools)}\nUse these tools when they can help you respond more effectively to the conversation.\nOnly use tools when they are relevant to the current conversation context.\nDon't mention the tools explicitly unless asked about your capabilities.\n\n"""
+    if agent_obj and hasattr(agent_obj, 'knowledge_base') and agent_obj.knowledge_base:
+        knowledge_descriptions = []
+        for doc in agent_obj.knowledge_base:
+            if hasattr(doc, 'metadata') and 'description' in doc.metadata:
+                knowledge_descriptions.append(doc.metadata['description'])
+        tail += f"""PERSONAL KNOWLEDGE BASE: You have access to a personal knowledge base containing the following documents:\n{chr(10).join(knowledge_descriptions)}\n\nUse the knowledge_base_retriever tool to search through these documents when relevant to the conversation. \nThis knowledge base contains specialized information that can help you stay true to your role and provide more informed responses.\nOnly search your knowledge base when the conversation topic relates to the content of your documents.\n\n"""
+
+    tail += f""" You haven't seen before any of the messages from other agents since your last response. Consider all the messages since your last response when responding. """
+    tail += f"""Give your response to the ongoing conversation as {agent_name}. \nKeep your response natural, conversational, and true to your character. Always respons with the charateristics/personality of your character. \nRespond as if you're speaking directly in the conversation (don't say \"As {agent_name}, I would say...\" just respond naturally).\nRespond only to the dialog parts said by the other agents.\nKeep responses to 1-3 sentences to maintain good conversation flow."""
+    return head, tail
+
+
+class PromptSegmentCache:
+    """
+    Per-agent cache of create_agent_prompt_segments results.
+    Entries are keyed by the agent and everything the segments are rendered from, so a scene change
+    re-renders them on the next call; clear() drops them when agents are rebuilt.
+    """
+
+    def __init__(self):
+        self._segments = {}  # agent_name -> (key, (head, tail))
+
+    def segments_for(self, agent_config, environment, scene_description, all_agents, agent_name=None, available_tools=None, agent_obj=None):
+        if not agent_name:
+            agent_name = agent_config["name"]
+        key = (agent_config.get("id"), environment, scene_description, tuple(all_agents), tuple(available_tools or ()))
+        cached = self._segments.get(agent_name)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        segments = create_agent_prompt_segments(agent_config, environment, scene_description, all_agents,
+                                                agent_name=agent_name, available_tools=available_tools, agent_obj=agent_obj)
+        self._segments[agent_name] = (key, segments)
+        return segments
+
+    def clear(self):
+        self._segments.clear()
+
+
+def create_agent_prompt(agent_config, environment, scene_description, messages, all_agents, termination_condition=None, should_remind_termination=False, conversation_id=None, agent_name=None, available_tools=None, agent_obj=None, prompt_segments=None):
+    """
+    Create the prompt for an agent including scene, participants, and conversation history.
+    Pass prompt_segments from create_agent_prompt_segments to reuse an already rendered head and tail.
+    """
+    if prompt_segments is None:
+        prompt_segments = create_agent_prompt_segments(agent_config, environment, scene_description, all_agents, agent_name, available_tools, agent_obj)
+    head, tail = prompt_segments
+
+    prompt = head
     # Always use the current messages list as the single source of truth
     if messages:
         if messages[0].get("past_convo_summary"):
@@ -130,39 +185,25 @@ def create_agent_prompt(agent_config, environment, scene_description, messages,
             prompt += "\n"
     if should_remind_termination and termination_condition:
         prompt += f"""TERMINATION CONDITION REMINDER: The conversation should end when the following condition is met:\n{termination_condition}\n\nKeep this condition in mind while participating in the conversation. Naturally deviate the conversation into the direction where the condition will be met. and stay true to your personality traits.\n\n"""
-    if available_tools:
-        prompt += f"""AVAILABLE TOOLS: You have access to the following tools: {', '.join(available_tools)}\nUse these tools when they can help you respond more effectively to the conversation.\nOnly use tools when they are relevant to the current conversation context.\nDon't mention the tools explicitly unless asked about your capabilities.\n\n"""
-    if agent_obj and hasattr(agent_obj, 'knowledge_base') and agent_obj.knowledge_base:
-        knowledge_descriptions = []
-        for doc in agent_obj.knowledge_base:
-            if hasattr(doc, 'metadata') and 'description' in doc.metadata:
-                knowledge_descriptions.append(doc.metadata['description'])
-        prompt += f"""PERSONAL KNOWLEDGE BASE: You have access to a personal knowledge base containing the following documents:\n{chr(10).join(knowledge_descriptions)}\n\nUse the knowledge_base_retriever tool to search through these documents when relevant to the conversation. \nThis knowledge base contains specialized information that can help you stay true to your role and provide more informed responses.\nOnly search your knowledge base when the conversation topic relates to the content of your documents.\n\n"""
-
-    prompt += f""" You haven't seen before any of the messages from other agents since your last response. Consider all the messages since your last response when responding. """
-    prompt += f"""Give your response to the ongoing conversation as {agent_name}. \nKeep your response natural, conversational, and true to your character. Always respons with the charateristics/personality of your character. \nRespond as if you're speaking directly in the conversation (don't say \"As {agent_name}, I would say...\" just respond naturally).\nRespond only to the dialog parts said by the other agents.\nKeep responses to 1-3 sentences to maintain good conversation flow."""
+    prompt += tail
     return prompt
 
 
 
-def _load_agent_tools(agent_name):
-    # Loads tools for a specific agent based on their configuration.
-    from .tools import (
-        get_browser_tools
+@functools.lru_cache(maxsize=32)
+def get_chat_model(model, temperature, max_retries, api_key):
+    """Return a shared chat model client for these settings, so agents with the same key reuse one client."""
+    return ChatGoogleGenerativeAI(
+        model=model,
+        temperature=temperature,
+        max_retries=max_retries,
+        google_api_key=api_key
     )
 
-    import importlib
-
 
-    browser_manipulation_toolkit = []
-    try:
-        browser_manipulation_toolkit =  get_browser_tools()
-            
-    except Exception:
-        pass
-    
+def _load_agent_tools(agent_name):
+    # Loads tools for a specific agent based on their configuration.
     # Load agent tool names from agents.json
-    import json, os
     agents_json_path = os.path.join(os.path.dirname(__file__), "agents.json")
     with open(agents_json_path, "r", encoding="utf-8") as f:
         agents_data = json.load(f)
@@ -171,11 +212,24 @@ def _load_agent_tools(agent_name):
         if agent.get("name") == agent_name:
             agent_tool_names = agent.get("tools", [])
             break
+    return list(_load_tools(tuple(agent_tool_names)))
+
+
+@functools.lru_cache(maxsize=64)
+def _load_tools(tool_names):
+    # Resolved once per distinct tool list, shared by every agent with that list; agents.json is still re-read so edits are picked up
+    from .tools import (
+        get_browser_tools
+    )
+
     loaded_tools = []
 
-    for tool_name in agent_tool_names:
+    for tool_name in tool_names:
         if tool_name == "browser_manipulation_toolkit":
-            loaded_tools.extend(browser_manipulation_toolkit)
+            try:
+                loaded_tools.extend(get_browser_tools())
+            except Exception:
+                pass
             continue
         try:
             tools_module = importlib.import_module(".tools", __package__)
@@ -183,9 +237,9 @@ def _load_agent_tools(agent_name):
             loaded_tools.append(tool_func)
             
         except (ImportError, AttributeError) as e:
-            print(f"Warning: Tool '{tool_name}' for agent '{agent_name}' not found: {e}")
+            print(f"Warning: Tool '{tool_name}' not found: {e}")
 
         
-    return loaded_tools
+    return tuple(loaded_tools)
 
 
@@ -40,7 +40,20 @@ CONVERSATION_TIMING = {
     "resume_delay": 1.0,
     
     # Delay when an error occurs and trying to continue
-    "error_retry_delay": 30.0
+    "error_retry_delay": 30.0,
+    
+    # Per-API-key retry backoff: the delay starts at retry_delay_min, doubles after each failed call
+    # (x4 on rate-limit/quota errors), drops by retry_delay_decrease after each success, and stays within [min, max]
+    "retry_delay_min": 1.0,
+    "retry_delay_max": 300.0,
+    "retry_delay_decrease": 5.0,
+    
+    # Consecutive failures on one API key before its agents are skipped, and for how long
+    "circuit_breaker_failures": 5,
+    "circuit_breaker_cooldown": 120.0,
+
+    # How long to gather message changes before writing the conversation to disk
+    "save_debounce_delay": 0.5
 }
 
 # Message handling settings
@@ -49,7 +62,11 @@ MESSAGE_SETTINGS = {
     "max_messages_before_summary": 20,
     
     # Number of recent messages to keep after summarization
-    "messages_to_keep_after_summary": 10
+    "messages_to_keep_after_summary": 10,
+    
+    # Character budget for the recent-message history sent with each prompt;
+    # older messages stay stored until summarization folds them into the summary
+    "max_history_chars": 12000
 }
 
 # Agent settings
@@ -70,6 +87,12 @@ AGENT_SETTINGS = {
     # Timeout for parallel agent responses in human-like-chat mode (seconds)
     "parallel_response_timeout": 30.0
 }
+
+# Text-to-speech settings
+AUDIO_SETTINGS = {
+    # Maximum total size of synthesized audio kept in memory for reuse (bytes)
+    "tts_cache_max_bytes": 10 * 1024 * 1024
+}
 #asas
 # Gemini model settings
 MODEL_SETTINGS = {
@@ -77,5 +100,26 @@ MODEL_SETTINGS = {
     "agent_model": "gemini-2.0-flash-exp",
     
     # Model name for summarization (can be different for cost optimization)
-    "summary_model": "gemini-2.0-flash-exp"
+    "summary_model": "gemini-2.0-flash-exp",
+    
+    # Maximum number of agent LLM calls in flight at once (keeps clear of provider rate limits)
+    "max_concurrency": 8,
+    
+    # Worker threads for blocking calls made from the async engines (sync tools, summarization)
+    "blocking_call_workers": 16,
+    
+    # Reuse an agent's earlier reply when it is sent an identical prompt (for replays and debugging)
+    "cache_responses": False,
+    
+    # Number of replies kept when response caching is on
+    "response_cache_size": 256
+}
+
+# Internet search tool settings
+SEARCH_SETTINGS = {
+    # Seconds a search result is reused for the same query before hitting Serper again
+    "cache_ttl": 600,
+    
+    # Number of distinct searches kept in the result cache
+    "cache_size": 512
 }
@@ -4,10 +4,8 @@ Handles starting, resuming, pausing, and updating multi-agent conversations.
 Delegates conversation flow to the appropriate engine based on invocation_method.
 """
 
-import json
-import os
 import random
-from dataclasses import asdict
+from datetime import datetime
 
 from .round_robin_engine import RoundRobinEngine
 from .agent_selector_engine import AgentSelectorEngine
@@ -20,13 +18,19 @@ class ConversationEngineFactory:
     def __init__(self, parent):
         self.parent = parent
         self.engines = {
-            "round_robin": parent.round_robin_engine,
             "agent_selector": parent.agent_selector_engine,
             "human_like_chat": parent.human_like_chat_engine
         }
 
-    def get_engine(self, invocation_method):
-        return self.engines.get(invocation_method, self.engines["round_robin"])
+    def get_engine(self, invocation_method, conversation_id=None):
+        engine = self.engines.get(invocation_method)
+        if engine is not None:
+            return engine
+        # Round robin keeps its state on the engine, so each conversation gets its own instance
+        engine = self.parent.current_engines.get(conversation_id)
+        if not isinstance(engine, RoundRobinEngine):
+            engine = RoundRobinEngine(self.parent)
+        return engine
 
 class ConversationEngine:
     def on_user_message(self, conversation_id, message_data):
@@ -39,7 +43,7 @@ class ConversationEngine:
             print(f"[ConversationEngine] No engine found for on_user_message on {conversation_id}")
     def __init__(self):
         self.active_conversations = {}
-        self.round_robin_engine = RoundRobinEngine(self)
+        self.data_manager = DataManager()
         self.agent_selector_engine = AgentSelectorEngine(self)
         self.human_like_chat_engine = HumanLikeChatEngine(self)
         self.current_engines = {}  # conversation_id -> engine instance
@@ -59,8 +63,7 @@ class ConversationEngine:
 
     def _load_conversation_details(self, conversation_id):
         print(f"📂 [ConversationEngine] Loading conversation details for ID: {conversation_id}")
-        data_manager = self.data_manager if hasattr(self, 'data_manager') else DataManager()
-        conversation = data_manager.get_conversation_by_id(conversation_id)
+        conversation = self.data_manager.get_conversation_by_id(conversation_id)
         if not conversation:
             print(f"❌ [ConversationEngine] Conversation ID '{conversation_id}' not found!")
             raise FileNotFoundError(f"Conversation ID '{conversation_id}' not found in conversations.json.")
@@ -69,12 +72,7 @@ class ConversationEngine:
 
     def start_conversation(self, conversation_id, agents_config, environment, scene_description, title=None, invocation_method="round_robin", termination_condition=None, agent_selector_api_key=None, voices_enabled=False):
         print(f"🚀 [ConversationEngine] Starting conversation '{conversation_id}' with method '{invocation_method}'...")
-        now = None
-        try:
-            from datetime import datetime
-            now = datetime.now().isoformat()
-        except Exception:
-            now = ""
+        now = datetime.now().isoformat()
         convo_details = {
             "id": conversation_id,
             "title": title if title else conversation_id,
@@ -92,17 +90,9 @@ class ConversationEngine:
             "last_updated": now,
             "thread_id": f"thread_{random.getrandbits(32):08x}"
         }
-        conversations_path = os.path.join(os.path.dirname(__file__), "conversations.json")
-        if os.path.exists(conversations_path):
-            with open(conversations_path, "r", encoding="utf-8") as f:
-                conversations = json.load(f)
-        else:
-            conversations = {"conversations": []}
-        conversations["conversations"].append(convo_details)
-        with open(conversations_path, "w", encoding="utf-8") as f:
-            json.dump(conversations, f, indent=2)
+        self.data_manager.append_conversation(convo_details)
         self.active_conversations[conversation_id] = convo_details
-        engine = self.engine_factory.get_engine(invocation_method)
+        engine = self.engine_factory.get_engine(invocation_method, conversation_id)
         self.current_engines[conversation_id] = engine
         print(f"🤝 [ConversationEngine] Handing over to engine: {engine.__class__.__name__}")
         # Use AgentSelectorEngine for 'agent_selector' invocation method
@@ -134,6 +124,19 @@ class ConversationEngine:
         else:
             print(f"⚠️ [ConversationEngine] No engine found to pause conversation '{conversation_id}' or invocation_method not round_robin.")
 
+    def stop_conversation(self, conversation_id):
+        print(f"⏹️ [ConversationEngine] Stopping conversation '{conversation_id}'...")
+        engine = self.current_engines.pop(conversation_id, None)
+        if engine is None:
+            print(f"⚠️ [ConversationEngine] No engine found to stop conversation '{conversation_id}'.")
+            return
+        if hasattr(engine, "pause_cycle"):
+            engine.pause_cycle(conversation_id)
+        # Round robin engines belong to a single conversation; the other engines are shared
+        if isinstance(engine, RoundRobinEngine):
+            engine.stop()
+        print(f"✅ [ConversationEngine] Conversation '{conversation_id}' stopped.")
+
     def update_scene_environment(self, conversation_id, environment=None, scene_description=None):
         print(f"🌄 [ConversationEngine] Updating scene/environment for conversation '{conversation_id}'...")
         engine = self.current_engines.get(conversation_id)
@@ -143,20 +146,43 @@ class ConversationEngine:
         else:
             print(f"⚠️ [ConversationEngine] No engine found to update scene/environment for '{conversation_id}'.")
 
+    def change_scene(self, conversation_id, environment=None, scene_description=None):
+        """Apply a new environment and/or scene to a running conversation without rebuilding its agents."""
+        self.update_scene_environment(conversation_id, environment or None, scene_description or None)
+
     def _save_conversation_state(self, conversation_id):
         print(f"💾 [ConversationEngine] Saving conversation state for '{conversation_id}'...")
-        data_manager = self.data_manager if hasattr(self, 'data_manager') else DataManager()
         convo = self.active_conversations.get(conversation_id)
         if convo is not None:
-            from dataclasses import asdict
             if hasattr(convo, '__dataclass_fields__'):
-                data_manager.save_conversation(convo)
+                self.data_manager.save_conversation(convo)
             else:
                 from .data_manager import Conversation
                 conversation_obj = Conversation(**convo)
-                data_manager.save_conversation(conversation_obj)
+                self.data_manager.save_conversation(conversation_obj)
         print(f"✅ [ConversationEngine] Conversation state saved for '{conversation_id}'.")
 
+    def get_conversation_summary(self, conversation_id):
+        """Return a short plain-text summary of an active conversation, or None if it is unknown."""
+        convo = self.active_conversations.get(conversation_id)
+        if convo is None:
+            return None
+        agent_names = []
+        for agent_id in convo.get("agents", []):
+            agent = self.data_manager.get_agent_by_id(agent_id)
+            agent_names.append(agent.name if agent else agent_id)
+        agents_str = ', '.join(agent_names)
+        env = convo.get("environment", "")
+        status = convo.get("status", "")
+        count = len(convo.get("messages", []))
+        return (f"Conversation Summary:\n\n"
+                f"Environment: {env}\n"
+                f"Participants: {agents_str}\n"
+                f"Messages exchanged: {count}\n"
+                f"Status: {status}\n\n"
+                f"The conversation has been taking place in {env}.\n"
+                f"The participants ({agents_str}) have exchanged {count} messages so far.")
+
     def register_message_callback(self, conversation_id, callback):
         print(f"🔔 [ConversationEngine] Registering message callback for '{conversation_id}'")
         if not hasattr(self, 'message_callbacks'):
@@ -166,9 +192,8 @@ class ConversationEngine:
 
     def resume_conversation(self, conversation_id):
         print(f"🔄 [ConversationEngine] Resuming past conversation '{conversation_id}'...")
-        data_manager = self.data_manager if hasattr(self, 'data_manager') else DataManager()
         print(f"📖 [ConversationEngine] Loading conversation from JSON...")
-        conversation = data_manager.get_conversation_by_id(conversation_id)
+        conversation = self.data_manager.get_conversation_by_id(conversation_id)
         if not conversation:
             print(f"❌ [ConversationEngine] Conversation ID '{conversation_id}' not found!")
             raise FileNotFoundError(f"Conversation ID '{conversation_id}' not found in conversations.json.")
@@ -179,11 +204,11 @@ class ConversationEngine:
             print(f"📝 [ConversationEngine] Initializing LLM_sending_messages list...")
             conversation.LLM_sending_messages = []
         print(f"💾 [ConversationEngine] Saving updated conversation status...")
-        data_manager.save_conversation(conversation)
+        self.data_manager.save_conversation(conversation)
         # Store in active_conversations
-        self.active_conversations[conversation_id] = asdict(conversation)
+        self.active_conversations[conversation_id] = vars(conversation)
         print(f"📦 [ConversationEngine] Loaded conversation info from JSON: {conversation}")
-        engine = self.engine_factory.get_engine(conversation.invocation_method)
+        engine = self.engine_factory.get_engine(conversation.invocation_method, conversation_id)
         self.current_engines[conversation_id] = engine
         print(f"🤝 [ConversationEngine] Handing over to engine: {engine.__class__.__name__}")
         # Use AgentSelectorEngine for 'agent_selector' invocation method
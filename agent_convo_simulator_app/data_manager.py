@@ -1,11 +1,19 @@
 import json
+import logging
 import os
+import threading
 import uuid
 from dataclasses import dataclass, field, asdict
 from datetime import datetime
 from typing import List, Dict, Any, Optional, Union
 import random
 
+logger = logging.getLogger(__name__)
+
+# Engines, their save flushers and the UI each hold their own DataManager, so the
+# read-modify-write cycles on the JSON files are serialised process-wide
+_json_write_lock = threading.RLock()
+
 
 @dataclass
 class Agent:
@@ -141,6 +149,65 @@ class ResearchConversation:
             agent_numbers=agent_numbers or {}
         )
     
+class SaveFlusher:
+    """Background writer that coalesces a burst of conversation saves into one save per conversation.
+
+    save is called with a conversation id from the flusher thread. The thread is started on the
+    first mark_dirty and exits after stop(), writing whatever is still pending first.
+    """
+
+    def __init__(self, save, delay, name="conversation_flusher"):
+        self._save = save
+        self._delay = delay
+        self._name = name
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def mark_dirty(self, conversation_id):
+        with self._lock:
+            self._pending.add(conversation_id)
+            if self._thread is None:
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, daemon=True, name=self._name)
+                self._thread.start()
+        self._wake.set()
+
+    def discard(self, conversation_id):
+        """Forget a pending save, e.g. because the caller is about to save it directly."""
+        with self._lock:
+            self._pending.discard(conversation_id)
+
+    def flush(self):
+        """Save every conversation marked dirty since the last flush."""
+        with self._lock:
+            conversation_ids, self._pending = self._pending, set()
+        for conversation_id in conversation_ids:
+            try:
+                self._save(conversation_id)
+            except Exception:
+                logger.exception("❌ [SaveFlusher] Saving conversation %s failed", conversation_id)
+
+    def stop(self):
+        """Let the flusher thread write what is pending and exit; a later mark_dirty starts a new one."""
+        self._stop.set()
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            # Debounce, cut short by stop()
+            self._stop.wait(self._delay)
+            self._wake.clear()
+            self.flush()
+            with self._lock:
+                if self._stop.is_set() and not self._pending:
+                    self._thread = None
+                    return
+
+
 class DataManager:
 
 
@@ -181,9 +248,12 @@ class DataManager:
             return {}
     
     def _save_json(self, file_path: str, data: Dict[str, Any]):
-        """Save JSON data to file."""
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)    
+        """Save JSON data to file, replacing it atomically so readers never see a partial write."""
+        tmp_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, file_path)
+
     # Agent management methods
     def load_agents(self, force_reload: bool = False) -> List[Agent]:
         """Load all agents from JSON file with caching."""
@@ -221,41 +291,43 @@ class DataManager:
     
     def save_agent(self, agent: Agent):
         """Save a single agent to JSON file."""
-        data = self._load_json(self.agents_file)
-        agents = data.get("agents", [])
+        with _json_write_lock:
+            data = self._load_json(self.agents_file)
+            agents = data.get("agents", [])
         
-        # Update existing agent or add new one
-        agent_dict = asdict(agent)
-        # Remove 'color' key if present
-        if 'color' in agent_dict:
-            del agent_dict['color']
-        for i, existing_agent in enumerate(agents):
-            # Remove 'color' key from existing agent dicts
-            if 'color' in existing_agent:
-                del existing_agent['color']
-            if existing_agent["id"] == agent.id:
-                agents[i] = agent_dict
-                break
-        else:
-            agents.append(agent_dict)
+            # Update existing agent or add new one
+            agent_dict = asdict(agent)
+            # Remove 'color' key if present
+            if 'color' in agent_dict:
+                del agent_dict['color']
+            for i, existing_agent in enumerate(agents):
+                # Remove 'color' key from existing agent dicts
+                if 'color' in existing_agent:
+                    del existing_agent['color']
+                if existing_agent["id"] == agent.id:
+                    agents[i] = agent_dict
+                    break
+            else:
+                agents.append(agent_dict)
         
-        data["agents"] = agents
-        self._save_json(self.agents_file, data)
+            data["agents"] = agents
+            self._save_json(self.agents_file, data)
         
-        # Invalidate cache
-        self._agents_cache = None
-        self._agents_cache_timestamp = None
+            # Invalidate cache
+            self._agents_cache = None
+            self._agents_cache_timestamp = None
     
     def delete_agent(self, agent_id: str):
         """Delete an agent from JSON file."""
-        data = self._load_json(self.agents_file)
-        agents = data.get("agents", [])   
-        data["agents"] = [a for a in agents if a["id"] != agent_id]
-        self._save_json(self.agents_file, data)
+        with _json_write_lock:
+            data = self._load_json(self.agents_file)
+            agents = data.get("agents", [])   
+            data["agents"] = [a for a in agents if a["id"] != agent_id]
+            self._save_json(self.agents_file, data)
         
-        # Invalidate cache
-        self._agents_cache = None
-        self._agents_cache_timestamp = None
+            # Invalidate cache
+            self._agents_cache = None
+            self._agents_cache_timestamp = None
     
     def remove_document_from_knowledge_base(self, agent_id: str, doc_name: str) -> bool:
         """
@@ -310,37 +382,20 @@ class DataManager:
                 print(f"Error loading conversation {conv_data.get('id', 'unknown')}: {e}")
         return conversations
     
-    def save_conversation(self, conversation: Conversation):
-        """Save a single conversation to JSON file."""
-        conversation.last_updated = datetime.now().isoformat()
-        
-        data = self._load_json(self.conversations_file)
-        conversations = data.get("conversations", [])
-        
-        # Update existing conversation or add new one
-        conv_dict = asdict(conversation)
-        # Remove agent_temp_numbers if present
-        if "agent_temp_numbers" in conv_dict:
-            del conv_dict["agent_temp_numbers"]
-        data_key = "agent_numbers"
-        # Ensure agent_numbers is present
-        if "agent_numbers" not in conv_dict and hasattr(conversation, "agent_numbers"):
-            conv_dict["agent_numbers"] = getattr(conversation, "agent_numbers", {})
-        for i, existing_conv in enumerate(conversations):
-            if existing_conv["id"] == conversation.id:
-                conversations[i] = conv_dict
-                break
-        else:
-            conversations.append(conv_dict)
-        data["conversations"] = conversations
-        self._save_json(self.conversations_file, data)
-    
     def delete_conversation(self, conversation_id: str):
         """Delete a conversation from JSON file."""
-        data = self._load_json(self.conversations_file)
-        conversations = data.get("conversations", [])
-        data["conversations"] = [c for c in conversations if c["id"] != conversation_id]
-        self._save_json(self.conversations_file, data)
+        with _json_write_lock:
+            data = self._load_json(self.conversations_file)
+            conversations = data.get("conversations", [])
+            data["conversations"] = [c for c in conversations if c["id"] != conversation_id]
+            self._save_json(self.conversations_file, data)
+    
+    def append_conversation(self, conversation_data: Dict[str, Any]):
+        """Append a raw conversation dict to the JSON file."""
+        with _json_write_lock:
+            data = self._load_json(self.conversations_file)
+            data.setdefault("conversations", []).append(conversation_data)
+            self._save_json(self.conversations_file, data)
     
     def get_conversation_by_id(self, conversation_id: str) -> Optional[Conversation]:
         """Get a specific conversation by ID."""
@@ -352,14 +407,15 @@ class DataManager:
     
     def add_message_to_conversation(self, conversation_id, message):
         """Add a message to a conversation and save to disk."""
-        # Remove timestamp and message_id if present
-        message.pop('timestamp', None)
-        message.pop('message_id', None)
+        with _json_write_lock:
+            # Remove timestamp and message_id if present
+            message.pop('timestamp', None)
+            message.pop('message_id', None)
         
-        conversation = self.get_conversation_by_id(conversation_id)
-        if conversation:
-            conversation.messages.append(message)
-            self.save_conversation(conversation)
+            conversation = self.get_conversation_by_id(conversation_id)
+            if conversation:
+                conversation.messages.append(message)
+                self.save_conversation(conversation)
     
     def get_conversations(self) -> List[Conversation]:
         """Retrieve all conversations from the JSON file."""
@@ -368,22 +424,23 @@ class DataManager:
     
     def update_agent_color(self, conversation_id: str, agent_name: str, color: str):
         """Update the color associated with an agent in a conversation's metadata."""
-        data = self._load_json(self.conversations_file)
-        conversations = data.get("conversations", [])
+        with _json_write_lock:
+            data = self._load_json(self.conversations_file)
+            conversations = data.get("conversations", [])
         
-        # Find the conversation
-        for conv in conversations:
-            if conv.get("id") == conversation_id:
-                # Initialize agent_colors if it doesn't exist
-                if "agent_colors" not in conv:
-                    conv["agent_colors"] = {}
+            # Find the conversation
+            for conv in conversations:
+                if conv.get("id") == conversation_id:
+                    # Initialize agent_colors if it doesn't exist
+                    if "agent_colors" not in conv:
+                        conv["agent_colors"] = {}
                 
-                # Update the color
-                conv["agent_colors"][agent_name] = color
-                break
+                    # Update the color
+                    conv["agent_colors"][agent_name] = color
+                    break
                 
-        data["conversations"] = conversations
-        self._save_json(self.conversations_file, data)
+            data["conversations"] = conversations
+            self._save_json(self.conversations_file, data)
     
     def get_agent_colors(self, conversation_id: str) -> Dict[str, str]:
         """Get the color mappings for agents in a conversation."""
@@ -408,22 +465,23 @@ class DataManager:
         
     def save_conversation(self, conversation: Conversation):
         """Save a single conversation to JSON file."""
-        conversation.last_updated = datetime.now().isoformat()
+        with _json_write_lock:
+            conversation.last_updated = datetime.now().isoformat()
         
-        data = self._load_json(self.conversations_file)
-        conversations = data.get("conversations", [])
+            data = self._load_json(self.conversations_file)
+            conversations = data.get("conversations", [])
         
-        # Update existing conversation or add new one
-        conv_dict = asdict(conversation)
-        for i, existing_conv in enumerate(conversations):
-            if existing_conv["id"] == conversation.id:
-                conversations[i] = conv_dict
-                break
-        else:
-            conversations.append(conv_dict)
+            # Update existing conversation or add new one
+            conv_dict = asdict(conversation)
+            for i, existing_conv in enumerate(conversations):
+                if existing_conv["id"] == conversation.id:
+                    conversations[i] = conv_dict
+                    break
+            else:
+                conversations.append(conv_dict)
         
-        data["conversations"] = conversations
-        self._save_json(self.conversations_file, data)
+            data["conversations"] = conversations
+            self._save_json(self.conversations_file, data)
     
     def reassign_voices_for_conversation(self, conversation_id: str, agent_ids: List[str]):
         """Reassign voices when agents in a conversation are modified."""
@@ -480,25 +538,27 @@ class DataManager:
 
     def save_research_conversation(self, research_conversation: ResearchConversation):
         """Save a single research conversation to JSON file."""
-        research_conversation.last_updated = datetime.now().isoformat()
-        data = self._load_json(self.research_conversations_file)
-        conversations = data.get("research_conversations", [])
-        conv_dict = asdict(research_conversation)
-        for i, existing_conv in enumerate(conversations):
-            if existing_conv["id"] == research_conversation.id:
-                conversations[i] = conv_dict
-                break
-        else:
-            conversations.append(conv_dict)
-        data["research_conversations"] = conversations
-        self._save_json(self.research_conversations_file, data)
+        with _json_write_lock:
+            research_conversation.last_updated = datetime.now().isoformat()
+            data = self._load_json(self.research_conversations_file)
+            conversations = data.get("research_conversations", [])
+            conv_dict = asdict(research_conversation)
+            for i, existing_conv in enumerate(conversations):
+                if existing_conv["id"] == research_conversation.id:
+                    conversations[i] = conv_dict
+                    break
+            else:
+                conversations.append(conv_dict)
+            data["research_conversations"] = conversations
+            self._save_json(self.research_conversations_file, data)
 
     def delete_research_conversation(self, research_id: str):
         """Delete a research conversation from JSON file."""
-        data = self._load_json(self.research_conversations_file)
-        conversations = data.get("research_conversations", [])
-        data["research_conversations"] = [c for c in conversations if c["id"] != research_id]
-        self._save_json(self.research_conversations_file, data)
+        with _json_write_lock:
+            data = self._load_json(self.research_conversations_file)
+            conversations = data.get("research_conversations", [])
+            data["research_conversations"] = [c for c in conversations if c["id"] != research_id]
+            self._save_json(self.research_conversations_file, data)
 
     def get_research_conversation_by_id(self, research_id: str) -> Optional[ResearchConversation]:
         """Get a specific research conversation by ID."""
@@ -510,12 +570,13 @@ class DataManager:
 
     def add_message_to_research_conversation(self, research_id, message):
         """Add a message to a research conversation and save to disk."""
-        message.pop('timestamp', None)
-        message.pop('message_id', None)
-        conversation = self.get_research_conversation_by_id(research_id)
-        if conversation:
-            conversation.messages.append(message)
-            self.save_research_conversation(conversation)
+        with _json_write_lock:
+            message.pop('timestamp', None)
+            message.pop('message_id', None)
+            conversation = self.get_research_conversation_by_id(research_id)
+            if conversation:
+                conversation.messages.append(message)
+                self.save_research_conversation(conversation)
 
     def get_research_conversations(self) -> List[ResearchConversation]:
         """Retrieve all research conversations from the JSON file."""
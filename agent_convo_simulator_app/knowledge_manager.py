@@ -9,6 +9,11 @@ import json
 import uuid
 import io
 import shutil
+import threading
+import logging
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
 
 # Load environment variables from .env file
 load_dotenv()
@@ -52,6 +57,48 @@ def get_embedding_model():
     
     return _embedding_model
 
+class _QueryResultCache:
+    """
+    Per-index LRU cache of knowledge base results, keyed by the normalized query text.
+    Asking the same question again skips the embedding and the Pinecone round trip.
+    """
+
+    def __init__(self, max_entries=1000):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # (index_name, top_k, normalized query) -> results
+
+    @staticmethod
+    def _key(index_name, top_k, query):
+        return index_name, top_k, " ".join(query.lower().split())
+
+    def lookup(self, index_name, top_k, query):
+        key = self._key(index_name, top_k, query)
+        with self.lock:
+            results = self.entries.get(key)
+            if results is None:
+                return None
+            self.entries.move_to_end(key)
+        # Callers get their own copies, so one caller's edits never leak into later hits
+        return [dict(result) for result in results]
+
+    def store(self, index_name, top_k, query, results):
+        key = self._key(index_name, top_k, query)
+        with self.lock:
+            self.entries[key] = [dict(result) for result in results]
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, index_name):
+        """Drop cached results for an index whose contents changed."""
+        with self.lock:
+            for key in [k for k in self.entries if k[0] == index_name]:
+                del self.entries[key]
+
+
+_query_cache = _QueryResultCache()
+
 def load_document(file_path):
     """Load document content from various file types."""
     print(f"   📄 Loading: {os.path.basename(file_path)}")
@@ -323,6 +370,7 @@ def ingest_agent_documents(agent_id: str, only_new: bool = True):
             
             # Upload to Pinecone
             pinecone_index.upsert(vectors)
+            _query_cache.invalidate(index_name)
             uploaded_count += len(vectors)
             print(f"      ✅ Uploaded {len(vectors)} vectors (total: {uploaded_count})")
         
@@ -384,6 +432,16 @@ def query_pinecone(index_name: str, query: str, top_k: int = 3):
         
         print(f"   ✅ Pinecone credentials found")
         
+        cached_results = _query_cache.lookup(index_name, top_k, query)
+        if cached_results is not None:
+            logger.debug("♻️ Reusing results from an identical earlier query to %s", index_name)
+            return cached_results
+        
+        # Setup embedding model and encode query
+        print(f"   ⏳ Encoding query...")
+        model = get_embedding_model()
+        query_embedding = model.encode([query])[0].tolist()
+        
         # Initialize Pinecone
         print(f"   ⏳ Connecting to Pinecone...")
         start_time = time.time()
@@ -419,11 +477,6 @@ def query_pinecone(index_name: str, query: str, top_k: int = 3):
         except Exception as e:
             print(f"   ⚠️  Couldn't get index stats: {e}")
         
-        # Setup embedding model and encode query
-        print(f"   ⏳ Encoding query...")
-        model = get_embedding_model()
-        query_embedding = model.encode([query])[0].tolist()
-        
         # Perform query
         print(f"   🔍 Executing search...")
         query_start = time.time()
@@ -458,6 +511,7 @@ def query_pinecone(index_name: str, query: str, top_k: int = 3):
         else:
             print(f"   ❌ No relevant results found")
             
+        _query_cache.store(index_name, top_k, query, results)
         print(f"   🎯 Returning {len(results)} result(s)")
         return results
         
@@ -633,6 +687,7 @@ class KnowledgeManager:
             
             # Upload to Pinecone
             pinecone_index.upsert(vectors)
+            _query_cache.invalidate(index_name)
             print(f"✅ Uploaded {len(vectors)} vectors to Pinecone")
             
             print(f"✅ DOCUMENT INGESTION COMPLETED SUCCESSFULLY!")
@@ -693,6 +748,7 @@ class KnowledgeManager:
             return 0
         print(f"🗑️ Deleting {len(all_ids)} chunk(s) from index '{index_name}'...")
         pinecone_index.delete(ids=all_ids)
+        _query_cache.invalidate(index_name)
         print(f"✅ Deleted {len(all_ids)} chunk(s) for doc_id={doc_id}.")
         return len(all_ids)
 
@@ -4,6 +4,7 @@ A desktop application for simulating group conversations between AI agents using
 """
 
 import tkinter as tk
+import logging
 import os
 import sys
 
@@ -14,6 +15,7 @@ from .main_app import AgentConversationSimulatorGUI
 
 if __name__ == "__main__":
     """Main entry point for the application."""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
     root = tk.Tk()
     app = AgentConversationSimulatorGUI(root)
     root.mainloop()
@@ -361,19 +361,8 @@ class AgentConversationSimulatorGUI:
             return
         
         try:
-            # Create a scene change message for the conversation
-            scene_change_message = f"SCENE CHANGE: "
-            if new_env:
-                scene_change_message += f"Environment changed to: {new_env}. "
-            if new_scene_text:
-                scene_change_message += f"Scene description: {new_scene_text}"
-            
-            # Send the scene change as a system message
-            threading.Thread(
-                target=self._send_message_thread,
-                args=(scene_change_message, "system"),
-                daemon=True
-            ).start()
+            # Agents read the environment and scene from the conversation on their next prompt
+            self.conversation_engine.change_scene(self.current_conversation_id, new_env, new_scene_text)
             
             # Update the UI
             if new_env and hasattr(self, 'current_env_label'):
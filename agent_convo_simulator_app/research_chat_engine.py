@@ -13,8 +13,7 @@ from langgraph.prebuilt import create_react_agent
 from .config import CONVERSATION_TIMING, AGENT_SETTINGS, MODEL_SETTINGS
 from .audio_manager import AudioManager
 from .data_manager import DataManager
-from .backend_utils import _load_agent_tools, create_agent_base_prompt, create_agent_prompt, message_list_summarization
-from langgraph.checkpoint.memory import InMemorySaver
+from .backend_utils import _load_agent_tools, get_chat_model, create_agent_base_prompt, create_agent_prompt, message_list_summarization
 import os
 from .agent_selector import AgentSelector
 
@@ -55,6 +54,8 @@ class ResearchChatEngine:
         self.agent_instances = []
         self.agents_last_seen_messages = {}
         self.is_txt_n_audio_playing = False
+        # Bumped by start/resume/pause; a driver thread whose run id is stale stops at its next check
+        self._run_id = 0
 
     def _extract_json(self, text: str):
         """Extract JSON from the response text, handling different formats."""
@@ -113,12 +114,11 @@ class ResearchChatEngine:
             agent_tools = _load_agent_tools(agent_name)
             base_prompt = create_agent_base_prompt(agent_config)
             agent_api_key = agent_config.get("api_key") or getattr(self.parent_engine, "default_api_key", None)
-            from langchain_google_genai import ChatGoogleGenerativeAI
-            agent_model = ChatGoogleGenerativeAI(
-                model=MODEL_SETTINGS["agent_model"],
-                temperature=AGENT_SETTINGS["response_temperature"],
-                max_retries=AGENT_SETTINGS["max_retries"],
-                google_api_key=agent_api_key
+            agent_model = get_chat_model(
+                MODEL_SETTINGS["agent_model"],
+                AGENT_SETTINGS["response_temperature"],
+                AGENT_SETTINGS["max_retries"],
+                agent_api_key
             )
             agent_variable = create_react_agent(
                 model=agent_model,
@@ -132,10 +132,15 @@ class ResearchChatEngine:
                 "config": agent_config
             })
         print(f"✅ [ResearchChatEngine] All agents initialized. Starting chat thread.")
-        self._thread = threading.Thread(target=self._run_research_chat, daemon=True)
+        self._run_id += 1
+        self._thread = threading.Thread(target=self._run_research_chat, args=(self._run_id,), daemon=True)
         self._thread.start()
 
-    def _run_research_chat(self):
+    def _stale(self, run_id):
+        """True once the driver started with run_id has been paused or superseded."""
+        return run_id != self._run_id or not self.active or self.paused
+
+    def _run_research_chat(self, run_id):
         print(f"[ResearchChatEngine] Main loop started.")
         # Initial agent selection using LLM
         llm_messages = self.convo.get("LLM_sending_messages", [])
@@ -152,6 +157,8 @@ class ResearchChatEngine:
             research_goal,
             agent_invocation_counts
         )
+        if self._stale(run_id):
+            return
         next_agent_name = selector_response.get("next_response")
         print(f"[ResearchChatEngine] LLM selected initial agent: {next_agent_name}")
         agent_config = next((a for a in self.agents if a["name"] == next_agent_name), None)
@@ -159,11 +166,10 @@ class ResearchChatEngine:
         if not agent_config or not agent_instance:
             print(f"❌ [ResearchChatEngine] Initial agent '{next_agent_name}' not found. Aborting.")
             return
-        self._invoke_and_handle_agent(agent_config, agent_instance)
-        while self.active:
-            if self.paused:
-                print("⏸️ [ResearchChatEngine] Paused. Waiting...")
-                time.sleep(0.2)
+        self._invoke_and_handle_agent(agent_config, agent_instance, run_id)
+        while True:
+            if self._stale(run_id):
+                print("⏸️ [ResearchChatEngine] Paused. Stopping chat thread.")
                 return
             last_message = self.last_message
             last_agent_name = last_message.get("agent_name")
@@ -174,21 +180,25 @@ class ResearchChatEngine:
                 if agent_name == last_agent_name:
                     continue
                 agent_config = agent_instance["config"]
-                t = threading.Thread(target=self._invoke_and_handle_agent, args=(agent_config, agent_instance))
+                t = threading.Thread(target=self._invoke_and_handle_agent, args=(agent_config, agent_instance, run_id))
                 threads.append(t)
             if not self.voices_enabled:
                 delay = self._get_turn_delay()
                 print(f"[ResearchChatEngine] Waiting {delay:.2f} seconds before parallel agent invocation.")
                 time.sleep(delay)
+                if self._stale(run_id):
+                    return
             for t in threads:
                 t.start()
             for t in threads:
                 t.join()
+            if self._stale(run_id):
+                return
             self.round_count += 1
             self._maybe_remind_termination()
             print(f"[ResearchChatEngine]: ended round {self.round_count-1}")
 
-    def _invoke_and_handle_agent(self, agent_config, agent_instance):
+    def _invoke_and_handle_agent(self, agent_config, agent_instance, run_id):
         try:
             agent_name = agent_config["name"]
             print(f"🧠 [ResearchChatEngine] Invoking agent: {agent_name}")
@@ -198,11 +208,14 @@ class ResearchChatEngine:
                 self.convo["scene_description"],
                 self.agent_order,
                 self.research_goal,
-                self._should_remind_termination())
+                self._should_remind_termination(),
+                run_id=run_id)
             
             agent_variable = agent_instance["agent_variable"]
-            config = {"configurable": {"thread_id": f"{self.convo_id}_{agent_name}"}}
-            response = agent_variable.invoke({"messages": [HumanMessage(content=prompt)]}, config)
+            response = agent_variable.invoke({"messages": [HumanMessage(content=prompt)]})
+            # A newer driver may own the conversation by the time the agent answers
+            if self._stale(run_id):
+                return
             if response and "messages" in response and response["messages"]:
                 agent_response = response["messages"][-1].content
             else:
@@ -232,10 +245,9 @@ class ResearchChatEngine:
                     }
                     self._display_message(agent_config, loading_message)
                     audio_data = self.audio_manager._generate_audio_sync(response_text, agent_config["voice"])
-                    if self.paused:
+                    if self._stale(run_id):
                         loading_message["loading"] = False
                         self._display_message(agent_config, loading_message)
-                        time.sleep(0.2)
                         return
                     print(f"[ResearchChatEngine] Audio received for agent: {agent_name}")
                     actual_message = {
@@ -251,7 +263,7 @@ class ResearchChatEngine:
                     }
                     while self.is_txt_n_audio_playing:
                         time.sleep(0.5)
-                    if self.paused:
+                    if self._stale(run_id):
                         return
                     self.is_txt_n_audio_playing = True
                     self._display_message(agent_config, actual_message, blinking=True)
@@ -270,6 +282,9 @@ class ResearchChatEngine:
                         time.sleep(1)
                     self.is_txt_n_audio_playing = True
                     time.sleep(5)
+                    if self._stale(run_id):
+                        self.is_txt_n_audio_playing = False
+                        return
                     self._display_message(agent_config, message)
                     self.is_txt_n_audio_playing = False
             else:
@@ -278,13 +293,15 @@ class ResearchChatEngine:
             print(f"❌ [ResearchChatEngine] Error invoking agent {agent_config['name']}: {e}")
             print(traceback.format_exc())
 
-    def _build_research_chat_prompt(self, agent_config, environment, scene_description, all_agents, research_goal=None, should_remind_termination=False):
+    def _build_research_chat_prompt(self, agent_config, environment, scene_description, all_agents, research_goal=None, should_remind_termination=False, run_id=None):
         """
         Create the prompt for an agent including scene, participants, and conversation history.
         """
 
-        self.convo["LLM_sending_messages"] = message_list_summarization(self.convo.get("LLM_sending_messages", []))
-        messages = self.convo.get("LLM_sending_messages", [])
+        messages = message_list_summarization(self.convo.get("LLM_sending_messages", []))
+        # A worker of a paused or superseded run must not replace the live history
+        if run_id is None or not self._stale(run_id):
+            self.convo["LLM_sending_messages"] = messages
 
         agent_name = agent_config["name"]
     
@@ -397,6 +414,7 @@ class ResearchChatEngine:
         print(f"[ResearchChatEngine] pause_cycle called for research_id={research_id}")
         self.active = False
         self.paused = True
+        self._run_id += 1
         if self.convo and "messages" in self.convo:
             print(f"[ResearchChatEngine] Saving displayed messages to conversations.json")
             self.parent_engine._save_conversation_state(research_id)
@@ -409,17 +427,18 @@ class ResearchChatEngine:
         print(f"[ResearchChatEngine] pause_cycle complete")
 
     def resume_cycle(self, research_id):
-        import time as _time
         import threading as _threading
         self.ui_callback = self.parent_engine.message_callbacks.get(research_id)
         print(f"[ResearchChatEngine] resume_cycle called for research_id={research_id} (thread: {_threading.current_thread().ident})")
         self.active = False
         self.paused = True
+        self._run_id += 1
         if hasattr(self, '_thread') and self._thread is not None:
             if self._thread.is_alive():
                 print("[ResearchChatEngine] Waiting for previous chat thread to finish...")
                 self._thread.join(timeout=5)
                 if self._thread.is_alive():
+                    # Its run id is stale, so it exits at its next check without touching the conversation
                     print("[ResearchChatEngine] Warning: Previous thread did not finish in time.")
         self.convo_id = research_id
         print(f"[ResearchChatEngine] _run_research_chat started (thread: {_threading.current_thread().ident})")
@@ -453,18 +472,16 @@ class ResearchChatEngine:
             agent_tools = _load_agent_tools(agent_name)
             base_prompt = create_agent_base_prompt(agent_config)
             agent_api_key = agent_config.get("api_key") or getattr(self.parent_engine, "default_api_key", None)
-            from langchain_google_genai import ChatGoogleGenerativeAI
-            agent_model = ChatGoogleGenerativeAI(
-                model=MODEL_SETTINGS["agent_model"],
-                temperature=AGENT_SETTINGS["response_temperature"],
-                max_retries=AGENT_SETTINGS["max_retries"],
-                google_api_key=agent_api_key
+            agent_model = get_chat_model(
+                MODEL_SETTINGS["agent_model"],
+                AGENT_SETTINGS["response_temperature"],
+                AGENT_SETTINGS["max_retries"],
+                agent_api_key
             )
             agent_variable = create_react_agent(
                 model=agent_model,
                 tools=agent_tools,
-                prompt=base_prompt,
-                checkpointer=InMemorySaver()
+                prompt=base_prompt
             )
             self.agent_instances.append({
                 "agent_name": agent_name,
@@ -478,12 +495,12 @@ class ResearchChatEngine:
                 "agent_variable": agent_variable,
                 "config": agent_config
             })
-        _time.sleep(20)
         self.active = True
         self.paused = False
         self.voices_enabled = self.convo.get("voices_enabled", False)
         print(f"✅ [ResearchChatEngine] Resuming convo: All agents initialized. Starting chat thread.")
-        self._thread = threading.Thread(target=self._run_research_chat, daemon=True)
+        self._run_id += 1
+        self._thread = threading.Thread(target=self._run_research_chat, args=(self._run_id,), daemon=True)
         self._thread.start()
 
     def update_scene_environment(self, research_id, environment=None, scene_description=None):
@@ -5,57 +5,53 @@ Handles starting and managing research group conversations, similar to Conversat
 
 import uuid
 from datetime import datetime
+import itertools
 import json
+import logging
 import os
 import random
-from dataclasses import asdict
 
 from .config import UI_COLORS
-from .data_manager import DataManager
+from .data_manager import DataManager, ResearchConversation
+
+logger = logging.getLogger(__name__)
 
 class ResearchTriggerEngine:
     def __init__(self, app):
         self.app = app
-        self.active_research = {}  # research_id -> config
-        self.message_callback = None
-       
+        self.active_researches = {}  # research_id -> research state dict
+        self.current_engines = {}  # research_id -> engine instance
+        self.message_callbacks = {}  # research_id -> UI callback
+
         self.data_manager = DataManager()
         self.agent_selector_api_key = os.getenv("GOOGLE_API_KEY2")
 
 
 
 
-    def register_message_callback(self, callback):
-        self.message_callback = callback
-        print("[ResearchTriggerEngine] Message callback registered.")
-
     def on_user_message(self, research_id, message_data):
-        print(f"[ResearchTriggerEngine] on_user_message called for {research_id}")
+        logger.debug("[ResearchTriggerEngine] on_user_message called for %s", research_id)
         engine = self.current_engines.get(research_id)
         if engine and hasattr(engine, "on_user_message"):
             engine.on_user_message(message_data)
         else:
-            print(f"[ResearchTriggerEngine] No engine found for on_user_message on {research_id}")
+            logger.warning("[ResearchTriggerEngine] No engine found for on_user_message on %s", research_id)
 
     def _assign_agent_numbers_and_colors(self, agents_config):
-        print("🎨 [ResearchTriggerEngine] Assigning agent numbers and colors...")
-        agent_temp_numbers = {}
-        agent_colors = {}
-        color_palette = UI_COLORS["agent_colors"]
-        for i, agent_config in enumerate(agents_config, 1):
-            agent_temp_numbers[agent_config["name"]] = i
-            agent_colors[agent_config["name"]] = color_palette[(i-1) % len(color_palette)]
-        print(f"✅ [ResearchTriggerEngine] Assigned numbers: {agent_temp_numbers}, colors: {agent_colors}")
+        logger.debug("🎨 [ResearchTriggerEngine] Assigning agent numbers and colors...")
+        names = [agent_config["name"] for agent_config in agents_config]
+        agent_temp_numbers = {name: i for i, name in enumerate(names, 1)}
+        agent_colors = dict(zip(names, itertools.cycle(UI_COLORS["agent_colors"])))
+        logger.debug("✅ [ResearchTriggerEngine] Assigned numbers: %s, colors: %s", agent_temp_numbers, agent_colors)
         return agent_temp_numbers, agent_colors
 
     def _load_research_details(self, research_id):
-        print(f"📂 [ResearchTriggerEngine] Loading research details for ID: {research_id}")
-        data_manager = self.data_manager if hasattr(self, 'data_manager') else DataManager()
-        research = data_manager.get_conversation_by_id(research_id)
+        logger.debug("📂 [ResearchTriggerEngine] Loading research details for ID: %s", research_id)
+        research = self.data_manager.get_conversation_by_id(research_id)
         if not research:
-            print(f"❌ [ResearchTriggerEngine] Research ID '{research_id}' not found!")
+            logger.error("❌ [ResearchTriggerEngine] Research ID '%s' not found!", research_id)
             raise FileNotFoundError(f"Research ID '{research_id}' not found in conversations.json.")
-        print(f"✅ [ResearchTriggerEngine] Research loaded.")
+        logger.debug("✅ [ResearchTriggerEngine] Research loaded.")
         return research
 
     def start_research(self, research_id, agents_config, research_name, research_problem, extra_consider, research_goal, voices_enabled=False):
@@ -70,65 +66,40 @@ class ResearchTriggerEngine:
         ])
 
         # Save research details to file and memory
-        research_details = {
-            "id": research_id,
-            "research_name": research_name,
-            "research_problem": research_problem,
-            "extra_consider": extra_consider,
-            "research_goal": research_goal,
-            "agents": agents_config,
-            "voices_enabled": voices_enabled,
-            "messages": [],
-            "LLM_sending_messages": [],
-            "status": "active",
-            "created_at": now,
-            "last_updated": now,
-            "thread_id": f"thread_{random.getrandbits(32):08x}",
-            "agent_colors": agent_colors,
-            "agent_numbers": agent_numbers
-        }
-
-        
-        from .data_manager import ResearchConversation
-
         research_conv_obj = ResearchConversation(
-            id=research_details["id"],
-            research_name=research_details["research_name"],
-            research_problem=research_details["research_problem"],
-            extra_consider=research_details["extra_consider"],
-            research_goal=research_details["research_goal"],
-            agents=research_details["agents"],
-            messages=research_details["messages"],
-            created_at=research_details["created_at"],
-            last_updated=research_details["last_updated"],
-            thread_id=research_details["thread_id"],
-            status=research_details["status"],
-            voices_enabled=research_details["voices_enabled"],
-            agent_colors=research_details["agent_colors"],
-            agent_numbers=research_details["agent_numbers"]
+            id=research_id,
+            research_name=research_name,
+            research_problem=research_problem,
+            extra_consider=extra_consider,
+            research_goal=research_goal,
+            agents=agents_config,
+            messages=[],
+            created_at=now,
+            last_updated=now,
+            thread_id=f"thread_{random.getrandbits(32):08x}",
+            status="active",
+            voices_enabled=voices_enabled,
+            agent_colors=agent_colors,
+            agent_numbers=agent_numbers
         )
 
         self.data_manager.save_research_conversation(research_conv_obj)
-        # Use active_researches for consistency with rest of class
-        if not hasattr(self, 'active_researches'):
-            self.active_researches = {}
-        self.active_researches[research_id] = research_details
+        self.active_researches[research_id] = {**vars(research_conv_obj), "LLM_sending_messages": []}
 
         # Optionally, send a system message to the UI
-        if self.message_callback:
-            self.message_callback({
+        callback = self.message_callbacks.get(research_id)
+        if callback:
+            callback({
                 "sender": "System",
                 "content": f"Research '{research_name}' started.",
                 "timestamp": now,
                 "type": "system"
             })
 
-        print(f"🚀 [ResearchTriggerEngine] Starting research '{research_id}'...")
+        logger.debug("🚀 [ResearchTriggerEngine] Starting research '%s'...", research_id)
         engine = self.research_chat_engine
-        if not hasattr(self, 'current_engines'):
-            self.current_engines = {}
         self.current_engines[research_id] = engine
-        print(f"🤝 [ResearchTriggerEngine] Handing over to engine: {engine.__class__.__name__}")
+        logger.debug("🤝 [ResearchTriggerEngine] Handing over to engine: %s", engine.__class__.__name__)
         engine.start_cycle(
             research_id,
             agents_config,
@@ -136,7 +107,7 @@ class ResearchTriggerEngine:
             research_goal,  # Pass as 'termination_condition' for now
             self.agent_selector_api_key  # No API key needed
         )
-        print(f"✅ [ResearchTriggerEngine] Research '{research_id}' started.")
+        logger.info("✅ [ResearchTriggerEngine] Research '%s' started.", research_id)
 
     
     
@@ -144,13 +115,13 @@ class ResearchTriggerEngine:
     
     
     def pause_research(self, research_id):
-        print(f"⏸️ [ResearchTriggerEngine] Pausing research '{research_id}'...")
+        logger.debug("⏸️ [ResearchTriggerEngine] Pausing research '%s'...", research_id)
         engine = self.current_engines.get(research_id)
         if engine and hasattr(engine, "pause_cycle"):
             engine.pause_cycle(research_id)
-            print(f"✅ [ResearchTriggerEngine] Research '{research_id}' paused.")
+            logger.info("✅ [ResearchTriggerEngine] Research '%s' paused.", research_id)
         else:
-            print(f"⚠️ [ResearchTriggerEngine] No engine found to pause research '{research_id}'.")
+            logger.warning("⚠️ [ResearchTriggerEngine] No engine found to pause research '%s'.", research_id)
 
     
     
@@ -158,57 +129,52 @@ class ResearchTriggerEngine:
     
     
     def update_research_goal(self, research_id, research_goal=None):
-        print(f"🎯 [ResearchTriggerEngine] Updating research goal for '{research_id}'...")
+        logger.debug("🎯 [ResearchTriggerEngine] Updating research goal for '%s'...", research_id)
         engine = self.current_engines.get(research_id)
         if engine and hasattr(engine, "update_scene_environment"):
             engine.update_scene_environment(research_id, scene_description=research_goal)
-            print(f"✅ [ResearchTriggerEngine] Research goal updated for '{research_id}'.")
+            logger.info("✅ [ResearchTriggerEngine] Research goal updated for '%s'.", research_id)
         else:
-            print(f"⚠️ [ResearchTriggerEngine] No engine found to update research goal for '{research_id}'.")
+            logger.warning("⚠️ [ResearchTriggerEngine] No engine found to update research goal for '%s'.", research_id)
 
     def _save_research_state(self, research_id):
-        print(f"💾 [ResearchTriggerEngine] Saving research state for '{research_id}'...")
-        data_manager = self.data_manager if hasattr(self, 'data_manager') else DataManager()
+        logger.debug("💾 [ResearchTriggerEngine] Saving research state for '%s'...", research_id)
         research = self.active_researches.get(research_id)
         if research is not None:
-            from dataclasses import asdict
             if hasattr(research, '__dataclass_fields__'):
-                data_manager.save_conversation(research)
+                self.data_manager.save_conversation(research)
             else:
                 from .data_manager import Conversation
                 research_obj = Conversation(**research)
-                data_manager.save_conversation(research_obj)
-        print(f"✅ [ResearchTriggerEngine] Research state saved for '{research_id}'.")
+                self.data_manager.save_conversation(research_obj)
+        logger.debug("✅ [ResearchTriggerEngine] Research state saved for '%s'.", research_id)
 
     def register_message_callback(self, research_id, callback):
-        print(f"🔔 [ResearchTriggerEngine] Registering message callback for '{research_id}'")
-        if not hasattr(self, 'message_callbacks'):
-            self.message_callbacks = {}
+        logger.debug("🔔 [ResearchTriggerEngine] Registering message callback for '%s'", research_id)
         self.message_callbacks[research_id] = callback
-        print(f"✅ [ResearchTriggerEngine] Callback registered for '{research_id}'.")
+        logger.debug("✅ [ResearchTriggerEngine] Callback registered for '%s'.", research_id)
 
     def resume_research(self, research_id):
-        print(f"🔄 [ResearchTriggerEngine] Resuming past research '{research_id}'...")
-        data_manager = self.data_manager if hasattr(self, 'data_manager') else DataManager()
-        print(f"📖 [ResearchTriggerEngine] Loading research from JSON...")
-        research = data_manager.get_conversation_by_id(research_id)
+        logger.debug("🔄 [ResearchTriggerEngine] Resuming past research '%s'...", research_id)
+        logger.debug("📖 [ResearchTriggerEngine] Loading research from JSON...")
+        research = self.data_manager.get_conversation_by_id(research_id)
         if not research:
-            print(f"❌ [ResearchTriggerEngine] Research ID '{research_id}' not found!")
+            logger.error("❌ [ResearchTriggerEngine] Research ID '%s' not found!", research_id)
             raise FileNotFoundError(f"Research ID '{research_id}' not found in conversations.json.")
-        print(f"🟢 [ResearchTriggerEngine] Research found! Setting status to active...")
+        logger.debug("🟢 [ResearchTriggerEngine] Research found! Setting status to active...")
         research.status = "active"
         if not hasattr(research, "LLM_sending_messages") or research.LLM_sending_messages is None:
-            print(f"📝 [ResearchTriggerEngine] Initializing LLM_sending_messages list...")
+            logger.debug("📝 [ResearchTriggerEngine] Initializing LLM_sending_messages list...")
             research.LLM_sending_messages = []
-        print(f"💾 [ResearchTriggerEngine] Saving updated research status...")
-        data_manager.save_conversation(research)
-        self.active_researches[research_id] = asdict(research)
-        print(f"📦 [ResearchTriggerEngine] Loaded research info from JSON: {research}")
+        logger.debug("💾 [ResearchTriggerEngine] Saving updated research status...")
+        self.data_manager.save_conversation(research)
+        self.active_researches[research_id] = vars(research)
+        logger.debug("📦 [ResearchTriggerEngine] Loaded research info from JSON: %s", research)
         engine = self.research_chat_engine
         self.current_engines[research_id] = engine
-        print(f"🤝 [ResearchTriggerEngine] Handing over to engine: {engine.__class__.__name__}")
+        logger.debug("🤝 [ResearchTriggerEngine] Handing over to engine: %s", engine.__class__.__name__)
         if not research.messages or len(research.messages) == 0:
-            print(f"� [ResearchTriggerEngine] No messages found, starting new research chat cycle...")
+            logger.debug("🆕 [ResearchTriggerEngine] No messages found, starting new research chat cycle...")
             engine.start_cycle(
                 research_id,
                 research.agents,
@@ -217,9 +183,9 @@ class ResearchTriggerEngine:
                 None
             )
         else:
-            print(f"🔁 [ResearchTriggerEngine] Messages found, resuming research chat cycle...")
+            logger.debug("🔁 [ResearchTriggerEngine] Messages found, resuming research chat cycle...")
             engine.resume_cycle(research_id)
-        print(f"✅ [ResearchTriggerEngine] Research '{research_id}' resumed and set to active.")
+        logger.info("✅ [ResearchTriggerEngine] Research '%s' resumed and set to active.", research_id)
 
 
 
@@ -2,65 +2,204 @@
 Round Robin Conversation Engine
 Handles agent invocation in a round-robin fashion, with or without voice.
 """
+import asyncio
+import concurrent.futures
+import itertools
+import queue
 import threading
 import time
 import random
-import traceback
+import logging
+import hashlib
+import json
+import uuid
+from collections import OrderedDict
 from langchain_core.messages import HumanMessage
 from langgraph.prebuilt import create_react_agent
-from .config import CONVERSATION_TIMING, AGENT_SETTINGS, MODEL_SETTINGS
+from .config import CONVERSATION_TIMING, AGENT_SETTINGS, MODEL_SETTINGS, AUDIO_SETTINGS, MESSAGE_SETTINGS
 from .audio_manager import AudioManager
-from .data_manager import DataManager
-from .backend_utils import _load_agent_tools, create_agent_base_prompt, create_agent_prompt, message_list_summarization
-from langgraph.checkpoint.memory import InMemorySaver
+from .data_manager import DataManager, SaveFlusher
+from .backend_utils import _load_agent_tools, get_chat_model, create_agent_base_prompt, create_agent_prompt, PromptSegmentCache, message_list_summarization
 import os
+try:
+    from google.api_core.exceptions import ResourceExhausted
+except ImportError:
+    ResourceExhausted = None
 
+logger = logging.getLogger(__name__)
+
+# One event loop runs the LLM and TTS I/O of every round-robin conversation; the semaphore bounds
+# agent calls across all of them, so conversations progress independently up to the provider limit
+_io_loop = None
+_io_loop_lock = threading.Lock()
+_llm_sem = asyncio.Semaphore(MODEL_SETTINGS["max_concurrency"])
+# prompt hash -> agent reply, only used when MODEL_SETTINGS["cache_responses"] is on; touched only on _io_loop
+_response_cache = OrderedDict()
+
+
+def _is_rate_limited(error):
+    """True for quota and rate-limit errors, which deserve a much longer rest than a transient failure."""
+    if ResourceExhausted is not None and isinstance(error, ResourceExhausted):
+        return True
+    if 429 in (getattr(error, "code", None), getattr(error, "status_code", None)):
+        return True
+    text = str(error).lower()
+    return "resource_exhausted" in text or "resource has been exhausted" in text or "quota" in text
+
+
+class _KeyBackoff:
+    """AIMD retry delay and circuit breaker for one API key, shared by every conversation using it."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.delay = CONVERSATION_TIMING["retry_delay_min"]
+        self.failures = 0
+        self.retry_at = 0.0
+        self.open_until = 0.0
+
+    def record_success(self):
+        with self.lock:
+            self.delay = max(CONVERSATION_TIMING["retry_delay_min"], self.delay - CONVERSATION_TIMING["retry_delay_decrease"])
+            self.failures = 0
+            # The key works again, so nothing needs to wait out the last failure's delay
+            self.retry_at = 0.0
+
+    def record_failure(self, error):
+        now = time.monotonic()
+        rate_limited = _is_rate_limited(error)
+        with self.lock:
+            self.retry_at = now + self.delay
+            self.delay = min(CONVERSATION_TIMING["retry_delay_max"], self.delay * (4 if rate_limited else 2))
+            self.failures += 1
+            if self.failures >= CONVERSATION_TIMING["circuit_breaker_failures"]:
+                self.open_until = now + CONVERSATION_TIMING["circuit_breaker_cooldown"]
+                self.failures = 0
+
+    def open_remaining(self):
+        """Seconds until a tripped breaker closes again, 0 if it is closed."""
+        return max(0.0, self.open_until - time.monotonic())
+
+    def retry_remaining(self):
+        return max(0.0, self.retry_at - time.monotonic())
+
+
+_backoffs = {}
+_backoffs_lock = threading.Lock()
+
+
+def _get_backoff(api_key):
+    with _backoffs_lock:
+        backoff = _backoffs.get(api_key)
+        if backoff is None:
+            backoff = _backoffs[api_key] = _KeyBackoff()
+        return backoff
+
+
+def _get_io_loop():
+    """Return the shared round-robin I/O loop, starting it on first use."""
+    global _io_loop
+    with _io_loop_lock:
+        if _io_loop is None:
+            _io_loop = asyncio.new_event_loop()
+            # Sync tools (run_in_executor) and summarization (to_thread) use the default executor; keep it bounded
+            _io_loop.set_default_executor(concurrent.futures.ThreadPoolExecutor(
+                max_workers=MODEL_SETTINGS["blocking_call_workers"], thread_name_prefix="round_robin_blocking"))
+            threading.Thread(target=_io_loop.run_forever, daemon=True, name="round_robin_io").start()
+        return _io_loop
 
 
 class RoundRobinEngine:
     def on_user_message(self, message_data):
-        """Handle user message: terminate current thread, add message, and resume cycle."""
-        print(f"[RoundRobinEngine] on_user_message called with: {message_data}")
-        # Terminate current thread
-        self.active = True
-        self.paused = True
-        # Add user message to conversation
-        self._add_message_to_conversation(message_data)
-        # Resume cycle in a new thread
-        print("[RoundRobinEngine] Restarting round robin cycle after user message...")
-        self.active = True
-        self.paused = False
-        
+        """Handle user message: store it right away, and let a running round robin thread add it to the LLM history."""
+        logger.debug("[RoundRobinEngine] on_user_message called with: %s", message_data)
+        if self.paused or self._thread is None or not self._thread.is_alive():
+            self._add_message_to_conversation(message_data)
+        else:
+            self._add_message_to_conversation(message_data, to_llm=False)
+            self._user_msgs.put(message_data)
+
+    def _drain_user_messages(self):
+        """Add queued user messages to the LLM history; returns True if there were any."""
+        drained = False
+        while True:
+            try:
+                message_data = self._user_msgs.get_nowait()
+            except queue.Empty:
+                return drained
+            self._add_message_to_conversation(message_data)
+            drained = True
 
     def __init__(self, parent_engine):
         self.parent_engine = parent_engine
+        self._thread = None
         self.audio_manager = AudioManager()
-        self.lock = threading.Lock()
+        # Separate locks so TTS prefetch and message bookkeeping don't serialize on each other
+        self._messages_lock = threading.Lock()  # convo messages and their id sets
+        self._tts_cache_lock = threading.Lock()
         self.data_manager = DataManager()        
+        # User messages from the UI thread, drained by the round robin thread before each turn
+        self._user_msgs = queue.Queue()
+        # Set while paused; backs the `paused` property so sleeps can be woken by a pause
+        self._pause_event = threading.Event()
         self.active = True
         self.paused = False
         self.convo_id = None
         self.convo = None
         self.agents = []
+        self._agents_by_id = {}
+        self._agents_by_name = {}
         self.agent_numbers = {}
         self.agent_order = []
         self.voices_enabled = False
         self.termination_condition = None
+        self._termination_active = False
         self.termination_reminder_frequency = AGENT_SETTINGS["termination_reminder_frequency"]
         self.round_count = 0
         self.agent_selector_api_key = None
         self.current_agent_index = 0
         self.audio_manager.set_audio_ready_callback(self._on_audio_ready)
         self.audio_manager.set_audio_finished_callback(self._on_audio_finished)
-        self.waiting_for_audio = threading.Event()
-        self.waiting_for_audio.clear()
         self.last_message = None
         self.ui_callback = None
+        self.agent_instances = []
+        self._instances_by_name = {}
+        # LRU cache of synthesized audio, kept across pause/resume
+        self._tts_cache = OrderedDict()
+        self._tts_cache_bytes = 0
+        self._tts_cache_max_bytes = AUDIO_SETTINGS["tts_cache_max_bytes"]
+        # Event loop that runs the LLM and TTS I/O for each turn; the turn driver stays on its own thread
+        self._loop = _get_io_loop()
+        self._llm_sem = _llm_sem
+        self._prefetched = None  # (agent_id, Future[(message, audio_clips)])
+        self._prefetch_lock = threading.Lock()
+        # Bumped by start/resume/pause; a driver thread whose run id is stale stops at its next check
+        self._run_id = 0
+        # Future the driver is currently blocked on, cancelled by pause_cycle
+        self._inflight = None
+        # "_id"s already stored in convo["messages"] / convo["LLM_sending_messages"]
+        self._msg_ids = set()
+        self._llm_msg_ids = set()
+        self._summary_threshold = MESSAGE_SETTINGS["max_messages_before_summary"]
+        self._history_char_budget = MESSAGE_SETTINGS["max_history_chars"]
+        # Conversation saves are written by a background flusher instead of on every message
+        self._flusher = SaveFlusher(self.parent_engine._save_conversation_state,
+                                    CONVERSATION_TIMING["save_debounce_delay"], name="round_robin_flusher")
+        # Rendered head and tail of each agent's prompt, re-rendered when the scene changes
+        self._prompt_segments = PromptSegmentCache()
+
+    @property
+    def paused(self):
+        return self._pause_event.is_set()
+
+    @paused.setter
+    def paused(self, value):
+        if value:
+            self._pause_event.set()
+        else:
+            self._pause_event.clear()
 
     def start_cycle(self, conversation_id, agents, voices_enabled, termination_condition, agent_selector_api_key):
-        print(f"🚦 [RoundRobin] Starting round robin cycle for conversation: {conversation_id}")
-        import threading as _threading
-        print(f"🚦 [RoundRobin] Starting round robin cycle for conversation: {conversation_id} (thread: {_threading.current_thread().ident})")
+        logger.info("🚦 [RoundRobin] Starting round robin cycle for conversation: %s (thread: %s)", conversation_id, threading.current_thread().ident)
         self.convo_id = conversation_id
         self.convo = self.parent_engine.active_conversations[conversation_id]
         # agents is now a list of agent IDs, so fetch full agent dicts
@@ -73,12 +212,14 @@ class RoundRobinEngine:
             else:
                 missing_agents.append(agent_id)
         if missing_agents:
-            print(f"❌ [RoundRobin] Missing agent(s) in DataManager: {missing_agents}")
+            logger.error("❌ [RoundRobin] Missing agent(s) in DataManager: %s", missing_agents)
             raise ValueError(f"Missing agent(s) in DataManager: {missing_agents}")
+        self._index_agents()
         self.agent_numbers = self.convo.get("agent_numbers", {})
         self.agent_order = sorted(self.agent_numbers, key=lambda k: self.agent_numbers[k])
         self.voices_enabled = voices_enabled
         self.termination_condition = termination_condition
+        self._termination_active = bool(termination_condition)
         self.agent_selector_api_key = agent_selector_api_key
         self.round_count = 0
         self.active = True
@@ -89,158 +230,274 @@ class RoundRobinEngine:
         # Ensure LLM_sending_messages exists and is a list
         if "LLM_sending_messages" not in self.convo or not isinstance(self.convo["LLM_sending_messages"], list):
             self.convo["LLM_sending_messages"] = []
+        self._index_message_ids()
+        self._prompt_segments.clear()
         # --- Create all LangGraph agents at the start ---
-        self.agent_instances = []
+        self._build_agent_instances(reuse=False)
+        logger.info("✅ [RoundRobin] All agents initialized. Starting round robin thread.")
+        self._run_id += 1
+        self._thread = threading.Thread(target=self._run_round_robin, args=(self._run_id,), daemon=True)
+        self._thread.start()
+
+    def _index_agents(self):
+        """Build the id and name lookups for self.agents."""
+        self._agents_by_id = {a["id"]: a for a in self.agents}
+        self._agents_by_name = {a["name"]: a for a in self.agents}
+
+    def _agent_fingerprint(self, agent_config, agent_no):
+        """Hash of everything an agent instance is built from."""
+        payload = json.dumps({k: v for k, v in agent_config.items() if k != "agent_no"}, sort_keys=True, default=str)
+        return hashlib.blake2b(f"{agent_no}\0{payload}".encode("utf-8"), digest_size=16).hexdigest()
+
+    def _build_agent_instances(self, reuse):
+        """Create the LangGraph agent for each agent in agent_order, optionally reusing unchanged instances."""
+        existing = self._instances_by_name if reuse else {}
+        agent_instances = []
         for agent_id in self.agent_order:
-            agent_config = next(a for a in self.agents if a["id"] == agent_id)
+            agent_config = self._agents_by_id[agent_id]
             agent_name = agent_config["name"]
-            print(f"🤖 [RoundRobin] Initializing agent: {agent_name}")
+            agent_no = self.agent_numbers[agent_id]
+            fingerprint = self._agent_fingerprint(agent_config, agent_no)
+            entry = existing.get(agent_name)
+            if entry is not None and entry["fingerprint"] == fingerprint:
+                logger.debug("♻️ [RoundRobin] Reusing agent: %s", agent_name)
+                entry["config"] = agent_config
+                entry["msg_template"] = self._message_template(agent_id, agent_name)
+                agent_instances.append(entry)
+                continue
+            logger.debug("🤖 [RoundRobin] Initializing agent: %s", agent_name)
             agent_tools = _load_agent_tools(agent_name)
             base_prompt = create_agent_base_prompt(agent_config)
-            agent_api_key = agent_config.get("api_key") or getattr(self.parent_engine, "default_api_key", None)
-            from langchain_google_genai import ChatGoogleGenerativeAI
-            agent_model = ChatGoogleGenerativeAI(
-                model=MODEL_SETTINGS["agent_model"],
-                temperature=AGENT_SETTINGS["response_temperature"],
-                max_retries=AGENT_SETTINGS["max_retries"],
-                google_api_key=agent_api_key
+            agent_api_key = self._agent_api_key(agent_config)
+            agent_model = get_chat_model(
+                MODEL_SETTINGS["agent_model"],
+                AGENT_SETTINGS["response_temperature"],
+                AGENT_SETTINGS["max_retries"],
+                agent_api_key
             )
             agent_variable = create_react_agent(
                 model=agent_model,
                 tools=agent_tools,
-                prompt=base_prompt,
-                checkpointer=InMemorySaver()
+                prompt=base_prompt
             )
-            self.agent_instances.append({
+            agent_instances.append({
                 "agent_name": agent_name,
-                "agent_no": self.agent_numbers[agent_id],
+                "agent_no": agent_no,
                 "agent_variable": agent_variable,
-                "config": agent_config
+                "config": agent_config,
+                "fingerprint": fingerprint,
+                "msg_template": self._message_template(agent_id, agent_name)
             })
-        print(f"✅ [RoundRobin] All agents initialized. Starting round robin thread.")
-        threading.Thread(target=self._run_round_robin, daemon=True).start()
-        self._thread = threading.Thread(target=self._run_round_robin, daemon=True)
-        self._thread.start()
+        self.agent_instances = agent_instances
+        self._instances_by_name = {entry["agent_name"]: entry for entry in agent_instances}
+
+    def _message_template(self, agent_id, agent_name):
+        """Fields shared by every chat bubble an agent sends; copied and completed per message."""
+        return {
+            "agent_no": self.agent_numbers[agent_id],
+            "agent_id": agent_id,
+            "agent_name": agent_name,
+            "sender": agent_name,
+            "type": "ai"
+        }
 
-    def _run_round_robin(self):
-        while self.active:
-            if self.paused:
-                print("⏸️ [RoundRobin] Paused. Waiting...")
-                time.sleep(0.2)
+    def _stale(self, run_id):
+        """True once the driver started with run_id has been paused or superseded."""
+        return run_id != self._run_id or not self.active or self.paused
+
+    def _run_round_robin(self, run_id):
+        while True:
+            if self._stale(run_id):
+                logger.info("⏸️ [RoundRobin] Paused. Stopping round robin thread.")
                 return
+            if self._drain_user_messages():
+                # Any prefetched turn has not seen the user messages
+                self._discard_prefetch()
             agent_id = self.agent_order[self.current_agent_index]
-            agent_config = next(a for a in self.agents if a["id"] == agent_id)
+            agent_config = self._agents_by_id[agent_id]
             agent_name = agent_config["name"]
-            print(f"➡️ [RoundRobin] Invoking agent: {agent_name}")
-            should_remind = self._should_remind_termination()
-            message = self._invoke_agent(agent_config, should_remind)
+            audio_clips = None
+            prefetched = self._take_prefetched(agent_id)
+            if prefetched is None and self._key_wait(agent_config):
+                # Back off per key: skip agents whose key is resting, sleep only if every key is
+                waits = [self._key_wait(self._agents_by_id[a]) for a in self.agent_order]
+                if all(waits):
+                    logger.warning("⚠️ [RoundRobin] Every agent's API key is backing off; waiting %.1f seconds.", min(waits))
+                    self._pause_event.wait(min(waits))
+                else:
+                    logger.warning("⏭️ [RoundRobin] API key for %s is backing off; skipping its turn.", agent_name)
+                    self._next_agent()
+                continue
+            if prefetched is not None:
+                logger.debug("➡️ [RoundRobin] Using prefetched response for agent: %s", agent_name)
+                message, audio_clips = self._wait_inflight(prefetched, (None, None))
+            else:
+                logger.debug("➡️ [RoundRobin] Invoking agent: %s", agent_name)
+                should_remind = self._should_remind_termination()
+                message = self._invoke_agent(agent_config, should_remind)
+            # Everything below writes to the conversation, which a newer driver may own by now
+            if self._stale(run_id):
+                return
             if not message:
-                print(f"⚠️ [RoundRobin] No message from agent: {agent_name}. Skipping to next agent.")
+                logger.warning("⚠️ [RoundRobin] No message from agent: %s. Skipping to next agent.", agent_name)
                 self._next_agent()
                 continue
-            print(f"📩 [RoundRobin] Message received from {agent_name}: {message['message'][:60]}...")
+            logger.debug("📩 [RoundRobin] Message received from %s: %s...", agent_name, message['message'][:60])
             if self.voices_enabled and agent_config.get("voice"):
-                print(f"🔊 [RoundRobin] Requesting audio for {agent_name}...")
-                self.last_message = message
-                self.waiting_for_audio.clear()
+                logger.debug("🔊 [RoundRobin] Requesting audio for %s...", agent_name)
                 # Show loading bubble using _display_message
                 loading_message_id = len(self.convo["messages"]) + 1
-                loading_message = {
-                    "agent_no": agent_config.get('agent_no'),
-                    "agent_id": agent_config.get('id'),
-                    "agent_name": agent_name,
-                    "message_id": loading_message_id,
-                    "sender": agent_name,
-                    "type": "ai",
-                    "timestamp": time.strftime("%H:%M:%S"),
-                    "loading": True
-                }
-                self._display_message(agent_config, loading_message)
-                # Request audio and wait for it to be ready
-                audio_data = self.audio_manager._generate_audio_sync(message["message"], agent_config["voice"])
-                
-                if self.paused:
+                msg_template = self._instances_by_name[agent_name]["msg_template"]
+                # No timestamp: _display_message drops it and the UI stamps bubbles as they arrive
+                loading_message = {**msg_template, "message_id": loading_message_id, "loading": True}
+                self._display_message(agent_config, loading_message, persist=False)
+                # Wait only for the first clip; the rest keep streaming in during playback
+                if audio_clips is None:
+                    audio_clips = self._tts_cache_get(message["message"], agent_config["voice"])
+                if audio_clips is None:
+                    audio_clips = self._stream_synthesis(message["message"], agent_config["voice"])
+                audio_clips = iter(audio_clips)
+                first_clip = next(audio_clips, None)
+
+                if self._stale(run_id):
                     loading_message["loading"] = False
-                    self._display_message(agent_config, loading_message)
-                    self.current_agent_index = (self.current_agent_index - 1) % len(self.agent_order)
-                    time.sleep(0.2)
-                    continue
+                    self._display_message(agent_config, loading_message, persist=False)
+                    return
 
-                print(f"[AUDIO READY] Audio received for agent: {agent_name}")
+                logger.debug("[AUDIO READY] Audio received for agent: %s", agent_name)
                 # Remove loading bubble and display actual message
-                actual_message = {
-                    "agent_no": agent_config.get('agent_no'),
-                    "agent_id": agent_config.get('id'),
-                    "agent_name": agent_name,
-                    "message_id": loading_message_id,
-                    "sender": agent_name,
-                    "type": "ai",
-                    "timestamp": time.strftime("%H:%M:%S"),
-                    "message": message["message"],
-                    "loading": False
-                }
-                self._display_message(agent_config, actual_message, blinking=True)
+                actual_message = {**msg_template, "message_id": loading_message_id,
+                                  "message": message["message"], "loading": False}
+                self.last_message = self._display_message(agent_config, actual_message, blinking=True)
+                # The next agent can already see this message, so start its turn during playback
+                self._prefetch_next_turn()
                 # Play audio
-                if audio_data:
-                    self.audio_manager._play_audio(audio_data, {
+                if first_clip is not None:
+                    self.audio_manager.play_chunks(itertools.chain((first_clip,), audio_clips), {
                         'conversation_id': self.convo_id,
                         'agent_id': agent_name,
                         'message_id': loading_message_id,
                         'text': message["message"],
                         'voice': agent_config["voice"]
                     })
-                print(f"✅ [RoundRobin] Audio finished for {agent_name}.")
+                logger.debug("✅ [RoundRobin] Audio finished for %s.", agent_name)
+                if self._stale(run_id):
+                    return
             else:
-                self._add_message_to_conversation(message)
-                self._display_message(agent_config, message)
+                # _display_message stores the tagged copy, so both modes persist the same message shape
+                self.last_message = self._display_message(agent_config, message)
+                # Let the next agent compose its reply during the turn delay rather than after it
+                self._prefetch_next_turn()
                 delay = self._get_turn_delay()
-                print(f"⏲️ [RoundRobin] Waiting {delay:.2f} seconds before next agent.")
-                time.sleep(delay)
+                logger.debug("⏲️ [RoundRobin] Waiting %.2f seconds before next agent.", delay)
+                # Returns early if the conversation is paused during the delay
+                self._pause_event.wait(delay)
+                if self._stale(run_id):
+                    return
             self._next_agent()
             if self.current_agent_index == 0:
                 self.round_count += 1
-                print(f"🔄 [RoundRobin] Completed a round. Total rounds: {self.round_count}")
+                logger.debug("🔄 [RoundRobin] Completed a round. Total rounds: %s", self.round_count)
             self._maybe_remind_termination()
 
 
+    def _run_async(self, coro):
+        """Schedule coro on the engine's event loop and return a concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def _agent_api_key(self, agent_config):
+        return agent_config.get("api_key") or getattr(self.parent_engine, "default_api_key", None)
+
+    def _key_wait(self, agent_config):
+        """Seconds until agent_config's API key may be used again, 0 if it is usable now."""
+        backoff = _get_backoff(self._agent_api_key(agent_config))
+        return max(backoff.open_remaining(), backoff.retry_remaining())
+
     def _invoke_agent(self, agent_config, should_remind=None):
+        return self._wait_inflight(self._run_async(self._invoke_agent_async(agent_config, should_remind)))
+
+    def _wait_inflight(self, future, cancelled=None):
+        """Return future's result, or cancelled if pause_cycle cancels it while we wait."""
+        self._inflight = future
+        try:
+            return future.result()
+        except concurrent.futures.CancelledError:
+            return cancelled
+        finally:
+            self._inflight = None
+
+    async def _invoke_agent_async(self, agent_config, should_remind=None):
+        backoff = _get_backoff(self._agent_api_key(agent_config))
+        if backoff.open_remaining():
+            logger.warning("⚠️ [RoundRobin] API key for %s is cooling down after repeated failures; skipping turn.", agent_config["name"])
+            return None
         try:
             agent_name = agent_config["name"]
-            print(f"🧠 [RoundRobin] Preparing to invoke agent: {agent_name}")
-            agent_entry = next(a for a in self.agent_instances if a["agent_name"] == agent_name)
+            logger.debug("🧠 [RoundRobin] Preparing to invoke agent: %s", agent_name)
+            agent_entry = self._instances_by_name[agent_name]
             agent_variable = agent_entry["agent_variable"]
             # Use LLM_sending_messages for summarization
             llm_messages = self.convo.get("LLM_sending_messages", [])
-            self.convo["LLM_sending_messages"] = message_list_summarization(llm_messages)
-            # Update LLM_sending_messages with the summarized result
+            # Summarization only does work past the threshold, so skip the worker-thread hop until then
+            if len(llm_messages) > self._summary_threshold:
+                with self._messages_lock:
+                    # The driver keeps appending to the live list, so summarize a snapshot of it
+                    snapshot = list(llm_messages)
+                summarized_count = len(snapshot)
+                # A cancelled turn stops at this await and leaves the history alone
+                summarized = await asyncio.to_thread(message_list_summarization, snapshot, self._summary_threshold)
+                with self._messages_lock:
+                    # Keep messages added while summarizing; skip if another turn already replaced the list
+                    if self.convo["LLM_sending_messages"] is llm_messages:
+                        self.convo["LLM_sending_messages"] = summarized + llm_messages[summarized_count:]
              
             tool_names = agent_config["tools"]
-            thread_id = self.convo.get("thread_id")
-            if not thread_id:
-                import uuid
-                thread_id = f"thread_{uuid.uuid4().hex[:8]}"
-                self.convo["thread_id"] = thread_id
+            prompt_segments = self._prompt_segments.segments_for(
+                agent_config,
+                self.convo["environment"],
+                self.convo["scene_description"],
+                self.agent_order,
+                agent_name=agent_name,
+                available_tools=tool_names,
+                agent_obj=agent_config
+            )
             prompt = create_agent_prompt(
                 agent_config,
                 self.convo["environment"],
                 self.convo["scene_description"],
-                self.convo["LLM_sending_messages"],
+                self._prompt_window(self.convo["LLM_sending_messages"]),
                 self.agent_order,
                 self.termination_condition,
                 should_remind_termination=should_remind,
                 conversation_id=self.convo_id,
                 agent_name=agent_name,
                 available_tools=tool_names,
-                agent_obj=agent_config
+                agent_obj=agent_config,
+                prompt_segments=prompt_segments
             )
-            print(f"📝 [RoundRobin] Sending prompt to {agent_name} (length: {len(prompt)} chars)")
-            config = {"configurable": {"thread_id": f"{thread_id}_{agent_name}"}}
-            response = agent_variable.invoke({"messages": [HumanMessage(content=prompt)]}, config)
+            logger.debug("📝 [RoundRobin] Sending prompt to %s (length: %s chars)", agent_name, len(prompt))
+            cache_key = None
+            if MODEL_SETTINGS["cache_responses"]:
+                cache_key = hashlib.sha256(
+                    f"{MODEL_SETTINGS['agent_model']}\0{AGENT_SETTINGS['response_temperature']}\0{agent_entry['fingerprint']}\0{prompt}".encode("utf-8")
+                ).hexdigest()
+                cached_response = _response_cache.get(cache_key)
+                if cached_response is not None:
+                    _response_cache.move_to_end(cache_key)
+                    logger.debug("♻️ [RoundRobin] Using cached response for %s", agent_name)
+                    return {"agent_name": agent_name, "message": cached_response}
+            async with self._llm_sem:
+                response = await agent_variable.ainvoke({"messages": [HumanMessage(content=prompt)]})
+            backoff.record_success()
             if response and "messages" in response and response["messages"]:
                 agent_response = response["messages"][-1].content
+                if cache_key is not None:
+                    _response_cache[cache_key] = agent_response
+                    if len(_response_cache) > MODEL_SETTINGS["response_cache_size"]:
+                        _response_cache.popitem(last=False)
             else:
                 agent_response = f"(No response from {agent_name})"
-            print(f"💬 [RoundRobin] {agent_name} responded: {agent_response[:60]}...")
+            logger.debug("💬 [RoundRobin] %s responded: %s...", agent_name, agent_response[:60])
             message = {
                 "agent_name": agent_name,
                 "message": agent_response,
@@ -248,71 +505,179 @@ class RoundRobinEngine:
           
             return message
         except Exception as e:
-            print(f"❌ [RoundRobin] Error invoking agent {agent_config['name']}: {e}")
-            import traceback
-            print(traceback.format_exc())
+            logger.exception("❌ [RoundRobin] Error invoking agent %s: %s", agent_config['name'], e)
+            backoff.record_failure(e)
             return None
 
 
-    def _add_message_to_conversation(self, message):
+    def _prompt_window(self, llm_messages):
+        """Return the summary entry (if any) plus the newest messages that fit the history character budget."""
+        head = llm_messages[:1] if llm_messages and llm_messages[0].get("past_convo_summary") else []
+        window = []
+        used = 0
+        for msg in reversed(llm_messages[len(head):]):
+            used += len(msg.get("message", ""))
+            if window and used > self._history_char_budget:
+                break
+            window.append(msg)
+        window.reverse()
+        return head + window
+
+    def _stream_synthesis(self, text, voice):
+        """Yield audio clips for text as the TTS service produces them, caching the full set at the end."""
+        clips = queue.Queue()
+
+        async def pump():
+            async for clip in self.audio_manager.generate_audio_stream(text, voice):
+                clips.put(clip)
+
+        future = self._run_async(pump())
+        # Fires however the pump ends, including a cancel before it ever started
+        future.add_done_callback(lambda _: clips.put(None))
+        # Registered as in flight so a pause cuts the stream short
+        self._inflight = future
+        try:
+            received = []
+            while (clip := clips.get()) is not None:
+                received.append(clip)
+                yield clip
+        finally:
+            if self._inflight is future:
+                self._inflight = None
+        # A cancelled or failed stream is incomplete, so keep it out of the cache
+        if received and not future.cancelled() and future.exception() is None:
+            self._tts_cache_put(text, voice, tuple(received))
+
+    async def _synthesize_async(self, text, voice):
+        """Return the audio clips for text, served from the TTS cache when possible."""
+        audio_clips = self._tts_cache_get(text, voice)
+        if audio_clips is None:
+            audio_clips = tuple([clip async for clip in self.audio_manager.generate_audio_stream(text, voice)])
+            if not audio_clips:
+                return None
+            self._tts_cache_put(text, voice, audio_clips)
+        return audio_clips
+
+    def _prefetch_next_turn(self):
+        """Start the next agent's LLM call (and its TTS, if voiced) on the event loop."""
+        next_index = (self.current_agent_index + 1) % len(self.agent_order)
+        next_agent_id = self.agent_order[next_index]
+        next_config = self._agents_by_id[next_agent_id]
+        if self._key_wait(next_config):
+            # Its turn will be skipped anyway
+            return
+        next_round = self.round_count + (1 if next_index == 0 else 0)
+        should_remind = self._termination_active and (next_round % self.termination_reminder_frequency == 0)
+        future = self._run_async(self._invoke_and_synthesize_async(next_config, should_remind))
+        with self._prefetch_lock:
+            previous, self._prefetched = self._prefetched, (next_agent_id, future)
+        if previous is not None:
+            previous[1].cancel()
+
+    def _take_prefetched(self, agent_id):
+        """Return the prefetched future for agent_id, cancelling any prefetch for another agent."""
+        with self._prefetch_lock:
+            prefetched, self._prefetched = self._prefetched, None
+        if prefetched is None:
+            return None
+        if prefetched[0] != agent_id:
+            prefetched[1].cancel()
+            return None
+        return prefetched[1]
+
+    def _discard_prefetch(self):
+        """Cancel the prefetched turn, if any, so it stops using an LLM slot and never touches the history."""
+        with self._prefetch_lock:
+            prefetched, self._prefetched = self._prefetched, None
+        if prefetched is not None:
+            prefetched[1].cancel()
+
+    async def _invoke_and_synthesize_async(self, agent_config, should_remind):
+        message = await self._invoke_agent_async(agent_config, should_remind)
+        audio_clips = None
+        if message and self.voices_enabled and agent_config.get("voice"):
+            audio_clips = await self._synthesize_async(message["message"], agent_config["voice"])
+        return message, audio_clips
+
+    def _tts_cache_key(self, text, voice):
+        return hashlib.blake2b(f"{voice}\0{text}".encode("utf-8"), digest_size=16).hexdigest()
+
+    def _tts_cache_get(self, text, voice):
+        """Return the cached tuple of audio clips for (text, voice), or None on a miss."""
+        key = self._tts_cache_key(text, voice)
+        with self._tts_cache_lock:
+            audio_clips = self._tts_cache.get(key)
+            if audio_clips is not None:
+                self._tts_cache.move_to_end(key)
+            return audio_clips
+
+    def _tts_cache_put(self, text, voice, audio_clips):
+        """Store audio clips for (text, voice), evicting least recently used entries over the size cap."""
+        size = sum(map(len, audio_clips))
+        if size > self._tts_cache_max_bytes:
+            return
+        key = self._tts_cache_key(text, voice)
+        with self._tts_cache_lock:
+            previous = self._tts_cache.pop(key, None)
+            if previous is not None:
+                self._tts_cache_bytes -= sum(map(len, previous))
+            self._tts_cache[key] = audio_clips
+            self._tts_cache_bytes += size
+            while self._tts_cache_bytes > self._tts_cache_max_bytes:
+                _, evicted = self._tts_cache.popitem(last=False)
+                self._tts_cache_bytes -= sum(map(len, evicted))
+
+    def _index_message_ids(self):
+        """Rebuild the stored-message id sets from the current conversation."""
+        with self._messages_lock:
+            self._msg_ids = {m["_id"] for m in self.convo.get("messages", []) if m.get("_id")}
+            self._llm_msg_ids = {m["_id"] for m in self.convo.get("LLM_sending_messages", []) if m.get("_id")}
+
+    def _add_message_to_conversation(self, message, to_llm=True):
+        # Tag the caller's dict so re-adding the same message is a set lookup, not a list scan
+        message_id = message.setdefault("_id", uuid.uuid4().hex)
         # Remove 'blinking' key before storing
         msg_to_store = dict(message)
         msg_to_store.pop('blinking', None)
-        with self.lock:
-            if msg_to_store not in self.convo["messages"]:
+        with self._messages_lock:
+            if message_id not in self._msg_ids:
+                self._msg_ids.add(message_id)
                 self.convo["messages"].append(msg_to_store)
-            if msg_to_store not in self.convo["LLM_sending_messages"]:
+            if to_llm and message_id not in self._llm_msg_ids:
+                self._llm_msg_ids.add(message_id)
                 self.convo["LLM_sending_messages"].append(msg_to_store)
-        self.parent_engine._save_conversation_state(self.convo_id)
+        self._flusher.mark_dirty(self.convo_id)
 
-    def _handle_voice_for_message(self, agent_config, message):
-        voice = agent_config.get("voice")
-        if not voice:
-            self._add_message_to_conversation(message)
-            self._display_message(agent_config, message)
-            return
-        # Request audio
-        self.last_message = message
-        if not hasattr(self, 'waiting_for_audio'):
-            self.waiting_for_audio = threading.Event()
-        self.waiting_for_audio.clear()
-        messages = self.convo.get("messages", [])
-        message_id = len(messages) + 1  # Use next message ID
-        self.audio_manager.request_audio(
-            self.convo_id,
-            agent_config["id"],
-            message_id,
-            message["message"],
-            voice
-        )
-        self._display_message(agent_config, message, blinking=True)
-        self.waiting_for_audio.wait()  # Wait for audio to finish
-
-    def _display_message(self, agent_config, message, blinking=False):
+    def _display_message(self, agent_config, message, blinking=False, persist=True):
+        """Send a copy of message, tagged with the agent's details, to the UI and return that copy.
+
+        The caller's dict is left untouched.
+        """
         ui_callback = self.ui_callback
-        # Remove timestamp and message_id if present
-        message.pop('timestamp', None)
-        message.pop('message_id', None)
+        # Drop timestamp and message_id from the copy
+        out = {k: v for k, v in message.items() if k not in ('timestamp', 'message_id')}
         # Add agent_no, agent_id, agent_name to message
         agent_no = agent_config.get('agent_no')
         agent_id = agent_config.get('id')
         agent_name = agent_config.get('name')
         if agent_no is not None:
-            message['agent_no'] = agent_no
+            out['agent_no'] = agent_no
         if agent_id:
-            message['agent_id'] = agent_id
+            out['agent_id'] = agent_id
         if agent_name:
-            message['agent_name'] = agent_name
+            out['agent_name'] = agent_name
         # Add blinking info to message
-        message['blinking'] = blinking
-        if 'message' in message and 'content' not in message:
-            message['content'] = message['message']
+        out['blinking'] = blinking
+        if 'message' in out and 'content' not in out:
+            out['content'] = out['message']
 
-        print(f"[RoundRobinEngine] Sending message to UI: {message}")
+        logger.debug("[RoundRobinEngine] Sending message to UI: %s", out)
         if ui_callback:
-            ui_callback(message)
-        # Only add to conversation once per agent turn
-        self._add_message_to_conversation(message)
+            ui_callback(out)
+        # Only add to conversation once per agent turn; transient bubbles (loading) are never stored
+        if persist:
+            self._add_message_to_conversation(out)
+        return out
 
     def _update_conversation_json_messages(self):
         # Use DataManager to update the messages for the current conversation
@@ -329,64 +694,74 @@ class RoundRobinEngine:
         return random.uniform(CONVERSATION_TIMING["agent_turn_delay_min"], CONVERSATION_TIMING["agent_turn_delay_max"])
 
     def _should_remind_termination(self):
-        return self.termination_condition and (self.round_count % self.termination_reminder_frequency == 0)
+        return self._termination_active and (self.round_count % self.termination_reminder_frequency == 0)
 
     def _maybe_remind_termination(self):
         # Optionally send a reminder message to all agents
-        if self.termination_condition and self._should_remind_termination():
-            print(f"[RoundRobinEngine] Sending termination condition reminder: {self.termination_condition}")
+        if self._should_remind_termination():
+            logger.debug("[RoundRobinEngine] Sending termination condition reminder: %s", self.termination_condition)
             # You can implement actual reminder logic here if needed
-        else:
-            print(f"[RoundRobinEngine] No termination reminder needed this round.")
 
     def _next_agent(self):
         self.current_agent_index = (self.current_agent_index + 1) % len(self.agent_order)
 
     def pause_cycle(self, conversation_id):
-        print(f"[RoundRobinEngine] pause_cycle called for conversation_id={conversation_id}")
-        # Terminate any ongoing round robin thread
+        logger.info("[RoundRobinEngine] pause_cycle called for conversation_id=%s", conversation_id)
+        # Terminate any ongoing round robin thread, waking it if it is blocked on an agent call or TTS
         self.active = False
         self.paused = True
+        self._run_id += 1
+        inflight = self._inflight
+        if inflight is not None:
+            inflight.cancel()
         # Save all displayed messages to conversations.json
+        self._drain_user_messages()
+        self._flusher.discard(conversation_id)
+        self._flusher.stop()
         if self.convo and "messages" in self.convo:
-            print(f"[RoundRobinEngine] Saving displayed messages to conversations.json")
+            logger.debug("[RoundRobinEngine] Saving displayed messages to conversations.json")
             self.parent_engine._save_conversation_state(conversation_id)
         # Remove all pending audio messages and their audio
         if hasattr(self, 'audio_manager') and hasattr(self.audio_manager, 'pending_audio'):
-            print(f"[RoundRobinEngine] Removing pending audio messages")
+            logger.debug("[RoundRobinEngine] Removing pending audio messages")
             self.audio_manager.pending_audio.clear()
-        # Remove messages that were waiting for audio and not displayed
-        if hasattr(self, 'waiting_for_audio'):
-            self.waiting_for_audio.clear()
         # Optionally, remove any messages in convo that were not displayed due to waiting for audio
         self.last_message = None
-        print(f"[RoundRobinEngine] pause_cycle complete")
+        # A prefetched turn was built from the pre-pause history, so drop it
+        self._discard_prefetch()
+        logger.info("[RoundRobinEngine] pause_cycle complete")
+
+    def stop(self):
+        """Release the flusher and audio threads once the conversation is stopped for good."""
+        self._flusher.stop()
+        self.audio_manager.stop()
 
     def resume_cycle(self, conversation_id):
-        import time as _time
-        import threading as _threading
-        print(f"[RoundRobinEngine] resume_cycle called for conversation_id={conversation_id} (thread: {_threading.current_thread().ident})")
+        logger.info("[RoundRobinEngine] resume_cycle called for conversation_id=%s (thread: %s)", conversation_id, threading.current_thread().ident)
         # Ensure previous thread is stopped/paused before rebuilding agents
         self.active = False
         self.paused = True
+        self._run_id += 1
         self.ui_callback = self.parent_engine.message_callbacks.get(conversation_id)
         # Wait for previous thread to finish if it exists
         if hasattr(self, '_thread') and self._thread is not None:
             if self._thread.is_alive():
-                print("[RoundRobinEngine] Waiting for previous round robin thread to finish...")
+                logger.debug("[RoundRobinEngine] Waiting for previous round robin thread to finish...")
                 self._thread.join(timeout=5)
                 if self._thread.is_alive():
-                    print("[RoundRobinEngine] Warning: Previous thread did not finish in time.")
+                    # Its run id is stale, so it exits at its next check without touching the conversation
+                    logger.warning("[RoundRobinEngine] Warning: Previous thread did not finish in time.")
         # Restore all state
         self.convo_id = conversation_id
-        import threading as _threading
-        print(f"[RoundRobinEngine] _run_round_robin started (thread: {_threading.current_thread().ident})")
+        logger.info("[RoundRobinEngine] _run_round_robin started (thread: %s)", threading.current_thread().ident)
         self.convo = self.parent_engine.active_conversations.get(conversation_id)
         if not self.convo:
-            print(f"[RoundRobinEngine] No conversation found for id {conversation_id}")
+            logger.warning("[RoundRobinEngine] No conversation found for id %s", conversation_id)
             return
         messages = self.convo.get("messages", [])
-        print(f"[RoundRobinEngine] Loaded {len(messages)} messages from conversations.json")
+        logger.debug("[RoundRobinEngine] Loaded %s messages from conversations.json", len(messages))
+        self._index_message_ids()
+        self._prompt_segments.clear()
         # Rebuild agents and agent_order as in start_cycle
         self.agents = []
         missing_agents = []
@@ -403,76 +778,46 @@ class RoundRobinEngine:
             else:
                 missing_agents.append(agent_id)
         if missing_agents:
-            print(f"❌ [RoundRobinEngine] Missing agent(s) in DataManager: {missing_agents}")
+            logger.error("❌ [RoundRobinEngine] Missing agent(s) in DataManager: %s", missing_agents)
+        self._index_agents()
 
         # Map agent_id to agent_name
-        agent_id_to_name = {a["id"]: a["name"] for a in self.agents}
-        agent_name_to_id = {a["name"]: a["id"] for a in self.agents}
+        agent_name_to_id = {name: a["id"] for name, a in self._agents_by_name.items()}
         # Find last agent who responded
         last_agent_name = None
         for msg in reversed(messages):
             if msg.get("agent_name"):
                 last_agent_name = msg["agent_name"]
                 break
-        print(f"[RoundRobinEngine] Last agent to respond: {last_agent_name}")
+        logger.debug("[RoundRobinEngine] Last agent to respond: %s", last_agent_name)
         # Find agent_id of last agent
         last_agent_id = agent_name_to_id.get(last_agent_name) if last_agent_name else None
-        print(f"[RoundRobinEngine] Last agent id: {last_agent_id}")
+        logger.debug("[RoundRobinEngine] Last agent id: %s", last_agent_id)
         # Find next agent in round robin order
         if last_agent_id and self.agent_order:
             try:
                 last_index = self.agent_order.index(last_agent_id)
                 next_agent_index = (last_index + 1) % len(self.agent_order)
                 self.current_agent_index = next_agent_index
-                print(f"[RoundRobinEngine] Next agent index: {self.current_agent_index} ({self.agent_order[self.current_agent_index]})")
+                logger.debug("[RoundRobinEngine] Next agent index: %s (%s)", self.current_agent_index, self.agent_order[self.current_agent_index])
             except ValueError:
-                print(f"[RoundRobinEngine] Last agent id not found in agent_order, defaulting to 0")
+                logger.warning("[RoundRobinEngine] Last agent id not found in agent_order, defaulting to 0")
                 self.current_agent_index = 0
         else:
             self.current_agent_index = 0
-        print(f"[RoundRobinEngine] Ready to invoke next agent: {self.agent_order[self.current_agent_index] if self.agent_order else 'None'}")
+        logger.debug("[RoundRobinEngine] Ready to invoke next agent: %s", self.agent_order[self.current_agent_index] if self.agent_order else 'None')
 
-        # Rebuild agent_instances
-        self.agent_instances = []
-        for agent_id in self.agent_order:
-            agent_config = next(a for a in self.agents if a["id"] == agent_id)
-            agent_name = agent_config["name"]
-            print(f"🤖 [RoundRobin] Initializing agent: {agent_name}")
-            agent_tools = _load_agent_tools(agent_name)
-            base_prompt = create_agent_base_prompt(agent_config)
-            agent_api_key = agent_config.get("api_key") or getattr(self.parent_engine, "default_api_key", None)
-            from langchain_google_genai import ChatGoogleGenerativeAI
-            agent_model = ChatGoogleGenerativeAI(
-                model=MODEL_SETTINGS["agent_model"],
-                temperature=AGENT_SETTINGS["response_temperature"],
-                max_retries=AGENT_SETTINGS["max_retries"],
-                google_api_key=agent_api_key
-            )
-            agent_variable = create_react_agent(
-                model=agent_model,
-                tools=agent_tools,
-                prompt=base_prompt,
-                checkpointer=InMemorySaver()
-            )
-            self.agent_instances.append({
-                "agent_name": agent_name,
-                "agent_no": self.agent_numbers[agent_id],
-                "agent_variable": agent_variable,
-                "config": agent_config
-            })
-            print({
-                "agent_name": agent_name,
-                "agent_no": self.agent_numbers[agent_id],
-                "agent_variable": agent_variable,
-                "config": agent_config
-            })
-        _time.sleep(20)
+        # Rebuild agent_instances, keeping agents whose config has not changed since they were built
+        self._build_agent_instances(reuse=True)
         # Now safe to start the thread
         self.active = True
         self.paused = False
         self.voices_enabled = self.convo.get("voices_enabled", False)
-        print(f"✅ [RoundRobin] Resuming convo: All agents initialized. Starting round robin thread.")
-        self._thread = threading.Thread(target=self._run_round_robin, daemon=True)
+        self.termination_condition = self.convo.get("termination_condition")
+        self._termination_active = bool(self.termination_condition)
+        logger.info("✅ [RoundRobin] Resuming convo: All agents initialized. Starting round robin thread.")
+        self._run_id += 1
+        self._thread = threading.Thread(target=self._run_round_robin, args=(self._run_id,), daemon=True)
         self._thread.start()
 
     def update_scene_environment(self, conversation_id, environment=None, scene_description=None):
@@ -480,9 +825,11 @@ class RoundRobinEngine:
             self.convo["environment"] = environment
         if scene_description:
             self.convo["scene_description"] = scene_description
+        # A prefetched turn was prompted with the old scene
+        self._discard_prefetch()
 
     def _on_audio_ready(self, conversation_id, agent_id, message_id):
-        print(f"[AUDIO READY] Audio received for agent: {agent_id}, message_id: {message_id}")
+        logger.debug("[AUDIO READY] Audio received for agent: %s, message_id: %s", agent_id, message_id)
         # Display chat bubble when audio is ready
         # Find the last message for this agent in the active conversation
         convo = self.parent_engine.active_conversations.get(conversation_id)
@@ -490,13 +837,13 @@ class RoundRobinEngine:
             return
         for msg in reversed(convo["messages"]):
             if msg.get("agent_name") == agent_id or msg.get("sender") == agent_id:
-                agent_config = next((a for a in self.agents if a["name"] == agent_id), None)
+                agent_config = self._agents_by_name.get(agent_id)
                 if agent_config:
                     self._display_message(agent_config, msg, blinking=True)
                 break
 
     def _on_audio_finished(self, conversation_id, agent_id, message_id):
-        print(f"[AUDIO FINISHED] Audio finished for agent: {agent_id}, message_id: {message_id}")
+        logger.debug("[AUDIO FINISHED] Audio finished for agent: %s, message_id: %s", agent_id, message_id)
 
         # Notify UI to stop blinking
         if hasattr(self.parent_engine, "message_callbacks"):
@@ -514,5 +861,3 @@ class RoundRobinEngine:
                 self.parent_engine.chat_canvas.stop_bubble_blink(message_id)
             except Exception:
                 pass
-        if hasattr(self, 'waiting_for_audio'):
-            self.waiting_for_audio.set()
\ No newline at end of file
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Test script for the per-API-key retry backoff used by the round robin engine
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent_convo_simulator_app.config import CONVERSATION_TIMING
+from agent_convo_simulator_app.round_robin_engine import _KeyBackoff, _is_rate_limited
+
+
+def test_single_failure_then_success_recovers():
+    """One transient error followed by a success leaves the key usable almost immediately."""
+    backoff = _KeyBackoff()
+    backoff.record_failure(RuntimeError("connection reset"))
+    assert 0 < backoff.retry_remaining() <= CONVERSATION_TIMING["retry_delay_min"]
+    backoff.record_success()
+    assert backoff.retry_remaining() == 0
+    assert backoff.open_remaining() == 0
+    assert backoff.delay == CONVERSATION_TIMING["retry_delay_min"]
+
+
+def test_rate_limit_grows_faster_than_transient_errors():
+    transient = _KeyBackoff()
+    transient.record_failure(RuntimeError("connection reset"))
+    limited = _KeyBackoff()
+    limited.record_failure(RuntimeError("429 Resource has been exhausted (e.g. check quota)."))
+    assert limited.delay > transient.delay
+
+
+def test_rate_limit_detection():
+    assert _is_rate_limited(RuntimeError("429 Resource has been exhausted"))
+    assert not _is_rate_limited(RuntimeError("Agent mentioned 429 apples"))
+    assert not _is_rate_limited(ValueError("bad request"))
+
+
+if __name__ == "__main__":
+    test_single_failure_then_success_recovers()
+    test_rate_limit_grows_faster_than_transient_errors()
+    test_rate_limit_detection()
+    print("Key backoff tests passed!")
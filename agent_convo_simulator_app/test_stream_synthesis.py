@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Test script for cancelling the round robin engine's streamed TTS
+"""
+
+import asyncio
+import sys
+import os
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent_convo_simulator_app.round_robin_engine import RoundRobinEngine
+
+
+def test_cancel_pump_before_it_starts():
+    """A pause that cancels the TTS pump before it runs must not leave the driver blocked."""
+    engine = RoundRobinEngine.__new__(RoundRobinEngine)
+    # A loop that is never run, so the pump is still pending when it is cancelled
+    loop = asyncio.new_event_loop()
+    engine._loop = loop
+    engine._inflight = None
+    cached = []
+    engine._tts_cache_put = lambda *args: cached.append(args)
+
+    result = []
+    driver = threading.Thread(target=lambda: result.append(list(engine._stream_synthesis("Hello", "af_bella"))), daemon=True)
+    driver.start()
+    deadline = time.monotonic() + 5
+    while engine._inflight is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert engine._inflight is not None
+    engine._inflight.cancel()
+
+    driver.join(timeout=5)
+    assert not driver.is_alive()
+    assert result == [[]]
+    assert engine._inflight is None
+    assert cached == []
+    loop.close()
+
+
+if __name__ == "__main__":
+    test_cancel_pump_before_it_starts()
+    print("Stream synthesis cancel test passed!")
@@ -47,5 +47,14 @@ def test_voice_assignment():
     
     print("\nVoice assignment test completed successfully!")
 
+def test_available_voices_are_not_shared():
+    """Changing one manager's voices must not affect another manager."""
+    first = VoiceAssignmentManager()
+    expected = VoiceAssignmentManager().get_available_voices()
+    first.get_available_voices()["female"].clear()
+    first.voices["male"].append("am_test")
+    assert VoiceAssignmentManager().get_available_voices() == expected
+
 if __name__ == "__main__":
     test_voice_assignment()
+    test_available_voices_are_not_shared()
@@ -1,8 +1,11 @@
 from langchain_community.utilities import GoogleSerperAPIWrapper
+import functools
+import logging
 import pprint
 import os
+import threading
 import time
-from datetime import datetime
+from collections import OrderedDict
 from dotenv import load_dotenv
 from langchain_community.agent_toolkits import PlayWrightBrowserToolkit
 from langchain_core.tools import Tool, tool
@@ -11,12 +14,45 @@ from langchain_community.tools.playwright.utils import (
 )
 from typing import List, Dict, Any
 from .knowledge_manager import KnowledgeManager
+from .config import SEARCH_SETTINGS
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 
 search = GoogleSerperAPIWrapper()
 
+
+@functools.lru_cache(maxsize=32)
+def _get_serper(type, tbs=None):
+    """Return a shared Serper wrapper for the given search type and time filter."""
+    return GoogleSerperAPIWrapper(type=type, tbs=tbs)
+
+
+# (type, tbs, normalized query) -> (expiry time, results); agents often repeat a search within a conversation
+_search_cache = OrderedDict()
+_search_cache_lock = threading.Lock()
+
+def _cached_search(query, type="search", tbs=None):
+    """Run a Serper search, reusing a recent result for the same normalized query."""
+    key = (type, tbs, " ".join(query.lower().split()))
+    now = time.monotonic()
+    with _search_cache_lock:
+        entry = _search_cache.get(key)
+        if entry is not None and entry[0] > now:
+            _search_cache.move_to_end(key)
+            return entry[1]
+    wrapper = search if type == "search" and tbs is None else _get_serper(type, tbs)
+    results = wrapper.results(query)
+    with _search_cache_lock:
+        _search_cache[key] = (now + SEARCH_SETTINGS["cache_ttl"], results)
+        _search_cache.move_to_end(key)
+        while len(_search_cache) > SEARCH_SETTINGS["cache_size"]:
+            _search_cache.popitem(last=False)
+    return results
+
+
 internet_search_tool = Tool(
         name="Intermediate_Answer",
         func=search.run,
@@ -30,7 +66,7 @@ def search_internet_strucutred_output(query: str) -> dict:
     Args:
         query: the query to search for information.
     """
-    results = search.results(query)
+    results = _cached_search(query)
     return results
 
 
@@ -41,8 +77,7 @@ def search_images_from_internet(query: str) -> dict:
     Args:
         query: The query to search for images.
     """
-    search = GoogleSerperAPIWrapper(type="images")
-    results = search.results(query)
+    results = _cached_search(query, "images")
     return results
 
 @tool("search_news_from_internet")
@@ -55,9 +90,7 @@ def search_news_from_internet(query: str, past_period:str = "qdr:h") -> dict:
         qdr:h (past hour) qdr:d (past day) qdr:w (past week) qdr:m (past month) qdr:y (past year)
         You can specify intermediate time periods by adding a number: qdr:h12 (past 12 hours) qdr:d3 (past 3 days) qdr:w2 (past 2 weeks) qdr:m6 (past 6 months) qdr:m2 (past 2 years)
     """
-    
-    search = GoogleSerperAPIWrapper(type="news", tbs=past_period)
-    results = search.results(query)
+    results = _cached_search(query, "news", past_period)
     return results
 
 
@@ -68,8 +101,7 @@ def search_places_from_internet(query: str) -> dict:
     Args:
         query: The query to search for places (e.g., restaurants, businesses, landmarks in a location).
     """
-    search = GoogleSerperAPIWrapper(type="places")
-    results = search.results(query)
+    results = _cached_search(query, "places")
     return results
 
 
@@ -97,82 +129,73 @@ def knowledge_base_retriever(query: str, agent_id: str) -> List[Dict[str, Any]]:
         A list of dictionaries, where each dictionary contains the content
         and score of a relevant document.
     """
-    print(f"\n🔍 KNOWLEDGE BASE SEARCH INITIATED")
-    print(f"   🤖 Agent: {agent_id}")
-    print(f"   🔎 Query: '{query}'")
-    print(f"   📅 Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    logger.debug("🔍 Knowledge base search by %s: %r", agent_id, query)
     
     if not agent_id:
-        print(f"   ❌ Error: agent_id must be provided")
+        logger.error("❌ Knowledge base search failed: agent_id must be provided")
         return [{"error": "agent_id must be provided"}]
     
     if not query or not query.strip():
-        print(f"   ❌ Error: query cannot be empty")
+        logger.error("❌ Knowledge base search failed: query cannot be empty")
         return [{"error": "query cannot be empty"}]
     
     try:
         # The agent_id corresponds to the Pinecone index name
         # Convert to proper index format (lowercase, with dashes)
         index_name = f"agent-kb-{agent_id.lower().replace('_', '-')}"
-        print(f"   📋 Target index: {index_name}")
         
         # Query the knowledge base
-        print(f"   ⏳ Searching knowledge base...")
         search_start = time.time()
         
         km = get_knowledge_manager()
         results = km.query_pinecone(index_name, query, top_k=3)
         
-        search_time = time.time() - search_start
-        print(f"   ⏱️  Search completed in {search_time:.2f} seconds")
-        print(f"   📊 Results found: {len(results)}")
+        logger.debug("⏱️  Searched %s in %.2f seconds, %d result(s)", index_name, time.time() - search_start, len(results))
         
         if not results:
-            no_results_msg = "No relevant information found in the knowledge base."
-            print(f"   ℹ️  {no_results_msg}")
-            return [{"message": no_results_msg}]
+            return [{"message": "No relevant information found in the knowledge base."}]
         
-        # Log result summary
-        print(f"   ✅ Returning {len(results)} relevant result(s):")
-        for i, result in enumerate(results, 1):
-            score = result.get('score', 0.0)
-            content_preview = result.get('content', '')[:100] + '...' if len(result.get('content', '')) > 100 else result.get('content', '')
-            print(f"      {i}. Score: {score:.4f} | Preview: {content_preview}")
+        if logger.isEnabledFor(logging.DEBUG):
+            for i, result in enumerate(results, 1):
+                logger.debug("   %d. Score: %.4f | Preview: %.100s", i, result.get('score', 0.0), result.get('content', ''))
             
         return results
         
     except Exception as e:
         error_msg = f"Failed to retrieve information from knowledge base. {str(e)}"
-        print(f"   ❌ Search failed: {error_msg}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Knowledge base search failed: %s", error_msg)
         return [{"error": error_msg}]
 
 
 # Lazy loading for browser toolkit to avoid async/threading issues
 browser_manipulation_toolkit = None
+_browser_lock = threading.Lock()
 
 def get_browser_tools():
     """Get browser manipulation tools with lazy loading to avoid async/threading issues."""
     global browser_manipulation_toolkit
     
-    if browser_manipulation_toolkit is None:
-        try:
-            import asyncio
-            # Check if we're in the main thread and can create an event loop
+    if browser_manipulation_toolkit is not None:
+        return browser_manipulation_toolkit
+    # Engines build agents from several threads; only one of them may launch the browser
+    with _browser_lock:
+        if browser_manipulation_toolkit is None:
             try:
-                loop = asyncio.get_event_loop()
-            except RuntimeError:
-                # No event loop in current thread, create one
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-            
-            async_browser = create_async_playwright_browser()
-            toolkit = PlayWrightBrowserToolkit.from_browser(async_browser=async_browser)
-            browser_manipulation_toolkit = toolkit.get_tools()
-        except Exception as e:
-            print(f"Warning: Could not load browser tools: {e}")
-            # Return empty list if browser tools can't be loaded
-            browser_manipulation_toolkit = []
+                import asyncio
+                # Check if we're in the main thread and can create an event loop
+                try:
+                    loop = asyncio.get_event_loop()
+                except RuntimeError:
+                    # No event loop in current thread, create one
+                    loop = asyncio.new_event_loop()
+                    asyncio.set_event_loop(loop)
+                
+                async_browser = create_async_playwright_browser()
+                toolkit = PlayWrightBrowserToolkit.from_browser(async_browser=async_browser)
+                browser_manipulation_toolkit = toolkit.get_tools()
+            except Exception as e:
+                print(f"Warning: Could not load browser tools: {e}")
+                # Return empty list if browser tools can't be loaded
+                browser_manipulation_toolkit = []
     
     return browser_manipulation_toolkit
\ No newline at end of file
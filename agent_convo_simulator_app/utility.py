@@ -7,6 +7,75 @@ import json
 from typing import Dict, Any, Optional
 
 
+_CLOSERS = {'}': '{', ']': '['}
+
+# Patterns used by clean_json_string, compiled once
+_RE_FENCE_JSON_HEAD = re.compile(r'^```json\s*\n?', re.IGNORECASE)
+_RE_FENCE_HEAD = re.compile(r'^```\s*\n?')
+_RE_FENCE_TAIL = re.compile(r'\n?\s*```$')
+# Common prefixes that LLMs might add before the JSON
+_RE_PREFIX = re.compile(r"^(?:Here's the JSON:|Here is the JSON:|The JSON response is:|JSON:|Response:)\s*")
+
+
+def _iter_code_fences(text: str):
+    """Yield (language, body) for each ``` fenced block in text, in order."""
+    pos = 0
+    while True:
+        open_idx = text.find('```', pos)
+        if open_idx == -1:
+            return
+        body_start = open_idx + 3
+        close_idx = text.find('```', body_start)
+        if close_idx == -1:
+            return
+        body = text[body_start:close_idx]
+        newline = body.find('\n')
+        first_line = body if newline == -1 else body[:newline]
+        lang = first_line.strip()
+        if lang.isalnum():
+            body = body[len(first_line):]
+        else:
+            lang = ''
+        yield lang.lower(), body.strip()
+        pos = close_idx + 3
+
+
+def _scan_json_candidates(text: str):
+    """
+    Scan text once and return the balanced {...} and [...] spans it contains.
+    
+    Brackets inside JSON strings are ignored. Each list is ordered by start
+    position, so an enclosing span comes before the spans nested inside it.
+    """
+    objects = []
+    arrays = []
+    stack = []
+    in_string = False
+    escaped = False
+    for i, ch in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == '\\':
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '{' or ch == '[':
+            stack.append((ch, i))
+        elif ch in _CLOSERS:
+            if stack and stack[-1][0] == _CLOSERS[ch]:
+                opener, start = stack.pop()
+                (objects if opener == '{' else arrays).append((start, text[start:i + 1]))
+            else:
+                # Unbalanced closer: drop the partial spans and keep scanning
+                stack.clear()
+        elif ch == '"' and stack:
+            in_string = True
+    objects.sort()
+    arrays.sort()
+    return [span for _, span in objects], [span for _, span in arrays]
+
+
 def extract_json_from_markdown(response: str) -> Optional[Dict[str, Any]]:
     """
     Extract JSON from a markdown response string that came from an LLM.
@@ -29,82 +98,46 @@ def extract_json_from_markdown(response: str) -> Optional[Dict[str, Any]]:
     # Clean the response string
     response = response.strip()
     
-    # Pattern 1: JSON wrapped in ```json code block
-    json_pattern1 = r'```json\s*\n?(.*?)\n?\s*```'
-    match = re.search(json_pattern1, response, re.DOTALL | re.IGNORECASE)
-    
-    if match:
-        json_str = match.group(1).strip()
-        try:
-            return json.loads(json_str)
-        except json.JSONDecodeError:
-            pass
-    
-    # Pattern 2: JSON wrapped in ``` code block (without language specification)
-    json_pattern2 = r'```\s*\n?(.*?)\n?\s*```'
-    matches = re.findall(json_pattern2, response, re.DOTALL)
-    
-    for match in matches:
-        json_str = match.strip()
-        # Check if it looks like JSON (starts with { or [)
-        if json_str.startswith(('{', '[')):
+    # Code blocks: ```json blocks first, then any block whose body looks like JSON
+    fences = list(_iter_code_fences(response)) if '```' in response else []
+    for lang, body in fences:
+        if lang == 'json':
+            try:
+                return json.loads(body)
+            except json.JSONDecodeError:
+                break
+    for lang, body in fences:
+        if body.startswith(('{', '[')):
             try:
-                return json.loads(json_str)
+                return json.loads(body)
             except json.JSONDecodeError:
                 continue
     
-    # Pattern 3: Find JSON object starting with { and ending with }
-    json_pattern3 = r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}'
-    matches = re.findall(json_pattern3, response, re.DOTALL)
+    # Balanced objects, then arrays, found in a single pass over the response
+    objects, arrays = _scan_json_candidates(response)
     
-    for match in matches:
+    for candidate in objects:
         try:
-            return json.loads(match)
+            return json.loads(candidate)
         except json.JSONDecodeError:
             continue
     
-    # Pattern 4: Find JSON array starting with [ and ending with ]
-    json_pattern4 = r'\[[^\[\]]*(?:\[[^\[\]]*\][^\[\]]*)*\]'
-    matches = re.findall(json_pattern4, response, re.DOTALL)
-    
-    for match in matches:
+    for candidate in arrays:
         try:
-            parsed = json.loads(match)
-            # Convert array to dict if it contains objects
-            if isinstance(parsed, list) and len(parsed) > 0 and isinstance(parsed[0], dict):
-                return {"data": parsed}
-            elif isinstance(parsed, list):
-                return {"items": parsed}
-            return parsed
+            parsed = json.loads(candidate)
         except json.JSONDecodeError:
             continue
+        # Convert array to dict if it contains objects
+        if isinstance(parsed, list) and len(parsed) > 0 and isinstance(parsed[0], dict):
+            return {"data": parsed}
+        return {"items": parsed}
     
-    # Pattern 5: Try to parse the entire response as JSON
+    # Finally try to parse the entire response as JSON (e.g. a bare number or string)
     try:
         return json.loads(response)
     except json.JSONDecodeError:
         pass
     
-    # Pattern 6: Look for JSON-like content between lines
-    lines = response.split('\n')
-    json_lines = []
-    in_json = False
-    
-    for line in lines:
-        line = line.strip()
-        if line.startswith('{') or line.startswith('['):
-            in_json = True
-            json_lines = [line]
-        elif in_json:
-            json_lines.append(line)
-            if line.endswith('}') or line.endswith(']'):
-                json_str = '\n'.join(json_lines)
-                try:
-                    return json.loads(json_str)
-                except json.JSONDecodeError:
-                    in_json = False
-                    json_lines = []
-    
     return None
 
 
@@ -145,22 +178,12 @@ def clean_json_string(json_str: str) -> str:
     json_str = json_str.strip()
     
     # Remove markdown code block markers
-    json_str = re.sub(r'^```json\s*\n?', '', json_str, flags=re.IGNORECASE)
-    json_str = re.sub(r'^```\s*\n?', '', json_str)
-    json_str = re.sub(r'\n?\s*```$', '', json_str)
+    json_str = _RE_FENCE_JSON_HEAD.sub('', json_str)
+    json_str = _RE_FENCE_HEAD.sub('', json_str)
+    json_str = _RE_FENCE_TAIL.sub('', json_str)
     
     # Remove common prefixes that LLMs might add
-    prefixes_to_remove = [
-        "Here's the JSON:",
-        "Here is the JSON:",
-        "The JSON response is:",
-        "JSON:",
-        "Response:",
-    ]
-    
-    for prefix in prefixes_to_remove:
-        if json_str.startswith(prefix):
-            json_str = json_str[len(prefix):].strip()
+    json_str = _RE_PREFIX.sub('', json_str)
     
     return json_str
 
@@ -6,9 +6,12 @@ Handles assignment of voices to agents based on gender and availability
 import json
 import os
 import random
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Sequence
 from data_manager import Agent
 
+# (absolute path, mtime) -> voices by gender as tuples, shared by every manager instance
+_VOICE_CACHE = {}
+
 
 class VoiceAssignmentManager:
     """Manages voice assignment for agents based on gender."""
@@ -22,12 +25,23 @@ class VoiceAssignmentManager:
         
         self.voices_file_path = voices_file_path
         self.voices = self._load_voices()
+        # Voice pools by gender, built once and reused by every assignment
+        self._male = tuple(self.voices.get("male", ()))
+        self._female = tuple(self.voices.get("female", ()))
+        self._all = self._male + self._female
     
     def _load_voices(self) -> Dict[str, List[str]]:
         """Load available voices from JSON file."""
         try:
-            with open(self.voices_file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            path = os.path.abspath(self.voices_file_path)
+            key = (path, os.stat(path).st_mtime)
+            voices = _VOICE_CACHE.get(key)
+            if voices is None:
+                with open(path, 'r', encoding='utf-8') as f:
+                    voices = {gender: tuple(names) for gender, names in json.load(f).items()}
+                _VOICE_CACHE[key] = voices
+            # Each manager gets its own lists so callers can't change the shared pool
+            return {gender: list(names) for gender, names in voices.items()}
         except (FileNotFoundError, json.JSONDecodeError) as e:
             print(f"Warning: Could not load voices from {self.voices_file_path}: {e}")
             # Return default voices if file not found
@@ -55,63 +69,53 @@ class VoiceAssignmentManager:
         
         voice_assignments = existing_assignments.copy()
         
-        # Separate agents by gender
-        male_agents = [agent for agent in agents if agent.gender.lower() == "male"]
-        female_agents = [agent for agent in agents if agent.gender.lower() == "female"]
-        unspecified_agents = [agent for agent in agents if agent.gender.lower() not in ["male", "female"]]
-        
-        # Get available voices
-        available_male_voices = self.voices.get("male", []).copy()
-        available_female_voices = self.voices.get("female", []).copy()
+        # Separate agents by gender in one pass
+        buckets = {"male": [], "female": [], "other": []}
+        for agent in agents:
+            buckets.get(agent.gender.lower(), buckets["other"]).append(agent)
+        male_agents = buckets["male"]
+        female_agents = buckets["female"]
+        unspecified_agents = buckets["other"]
         
-        # Remove already assigned voices to avoid duplicates
-        for agent_id, voice in existing_assignments.items():
-            if voice in available_male_voices:
-                available_male_voices.remove(voice)
-            elif voice in available_female_voices:
-                available_female_voices.remove(voice)
+        # Get available voices, leaving out already assigned ones to avoid duplicates
+        assigned = set(existing_assignments.values())
+        available_male_voices = [voice for voice in self._male if voice not in assigned]
+        available_female_voices = [voice for voice in self._female if voice not in assigned]
         
         # Assign voices to male agents
-        for agent in male_agents:
-            if agent.id not in voice_assignments:
-                if available_male_voices:
-                    voice = random.choice(available_male_voices)
-                    voice_assignments[agent.id] = voice
-                    available_male_voices.remove(voice)
-                else:
-                    # If we run out of unique voices, use a random one
-                    voice_assignments[agent.id] = random.choice(self.voices.get("male", ["am_adam"]))
+        self._assign_group(male_agents, available_male_voices, self._male or ("am_adam",), voice_assignments)
         
         # Assign voices to female agents
-        for agent in female_agents:
-            if agent.id not in voice_assignments:
-                if available_female_voices:
-                    voice = random.choice(available_female_voices)
-                    voice_assignments[agent.id] = voice
-                    available_female_voices.remove(voice)
-                else:
-                    # If we run out of unique voices, use a random one
-                    voice_assignments[agent.id] = random.choice(self.voices.get("female", ["af_alloy"]))
+        self._assign_group(female_agents, available_female_voices, self._female or ("af_alloy",), voice_assignments)
         
         # Assign voices to unspecified gender agents (use available voices from either gender)
         all_available_voices = available_male_voices + available_female_voices
-        for agent in unspecified_agents:
-            if agent.id not in voice_assignments:
-                if all_available_voices:
-                    voice = random.choice(all_available_voices)
-                    voice_assignments[agent.id] = voice
-                    all_available_voices.remove(voice)
-                else:
-                    # If we run out of unique voices, use any random voice
-                    all_voices = self.voices.get("male", []) + self.voices.get("female", [])
-                    voice_assignments[agent.id] = random.choice(all_voices) if all_voices else "am_adam"
+        self._assign_group(unspecified_agents, all_available_voices, self._all or ("am_adam",), voice_assignments)
         
         return voice_assignments
     
+    @staticmethod
+    def _assign_group(agents: List[Agent], available: List[str], fallback_pool: Sequence[str], voice_assignments: Dict[str, str]) -> None:
+        """
+        Give each unassigned agent a distinct voice from available, drawn in one random.sample.
+        Agents left over once the unique voices run out get a random voice from fallback_pool.
+        Voices handed out are removed from available.
+        """
+        unassigned = [agent for agent in agents if agent.id not in voice_assignments]
+        picks = random.sample(available, min(len(unassigned), len(available)))
+        for agent, voice in zip(unassigned, picks):
+            voice_assignments[agent.id] = voice
+        for agent in unassigned[len(picks):]:
+            # If we run out of unique voices, use a random one
+            voice_assignments[agent.id] = random.choice(fallback_pool)
+        if picks:
+            taken = set(picks)
+            available[:] = [voice for voice in available if voice not in taken]
+    
     def get_voice_for_agent(self, agent_id: str, voice_assignments: Dict[str, str]) -> Optional[str]:
         """Get the assigned voice for a specific agent."""
         return voice_assignments.get(agent_id)
     
     def get_available_voices(self) -> Dict[str, List[str]]:
         """Get all available voices by gender."""
-        return self.voices.copy()
+        return {gender: list(names) for gender, names in self.voices.items()}